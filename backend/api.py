@@ -0,0 +1,87 @@
+"""
+App factory shared by server.py (full API) and crud_server.py (no chat).
+
+Routes live in routers/; heavy dependencies (ollama, pypdf) are imported on
+first use, so listing conversations never pays for them.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+from events import listen_forever
+from file_context import SUMMARY_SWEEP_INTERVAL_S, summary_worker
+from routers import conversations, events, files, users
+from upload_gc import collect_orphans
+
+logger = logging.getLogger(__name__)
+
+# opt-in periodic sweep, e.g. 21600 for every 6h; 0 (default) leaves it to the
+# CLI in upload_gc.py
+UPLOAD_GC_INTERVAL_S = int(os.environ.get("UPLOAD_GC_INTERVAL_S", "0"))
+
+
+async def upload_gc_loop(interval_s: int):
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            report = await asyncio.to_thread(collect_orphans, files.UPLOAD_DIR)
+            logger.info("upload gc: %s", report.as_dict())
+        except Exception:
+            logger.exception("upload gc failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one LISTEN connection per worker feeds its WebSocket subscribers
+    tasks = [asyncio.create_task(listen_forever())]
+    if UPLOAD_GC_INTERVAL_S > 0:
+        tasks.append(asyncio.create_task(upload_gc_loop(UPLOAD_GC_INTERVAL_S)))
+    if app.state.auto_title:
+        from titles import title_worker
+
+        tasks.append(asyncio.create_task(title_worker()))
+    if app.state.summarize_files and SUMMARY_SWEEP_INTERVAL_S > 0:
+        tasks.append(asyncio.create_task(summary_worker()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+
+
+def create_app(include_chat: bool = True) -> FastAPI:
+    # routes declare response models, so pydantic-core serializes them straight
+    # to JSON bytes; orjson is only used for the NDJSON export/import
+    app = FastAPI(lifespan=lifespan)
+    # only workers that generate replies have first exchanges to title
+    app.state.auto_title = include_chat
+    # same for file summaries, which only ever run in that sweep
+    app.state.summarize_files = include_chat
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # tighten in prod
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Markdown replies compress well; tiny responses are not worth the CPU.
+    # StreamingResponse (export) is compressed chunk by chunk as well.
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    app.include_router(conversations.router)
+    app.include_router(files.router)
+    app.include_router(users.router)
+    app.include_router(events.router)
+    if include_chat:
+        from routers import chat
+
+        app.include_router(chat.router)
+
+    return app
+
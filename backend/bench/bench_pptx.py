@@ -0,0 +1,119 @@
+"""
+Compares the streaming OOXML PPTX extractor against the previous
+python-pptx based one: wall time and peak Python memory (tracemalloc).
+
+    python bench/bench_pptx.py deck1.pptx deck2.pptx
+    python bench/bench_pptx.py --generate 400   # synthetic deck, needs python-pptx
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, cast
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extraction import extract_text_from_pptx  # noqa: E402
+
+
+def extract_text_from_pptx_python_pptx(path: str) -> tuple[str, int]:
+    """The extractor server.py used before the OOXML streaming parser."""
+    from pptx import Presentation
+
+    pres = Presentation(path)
+    parts: list[str] = []
+    slide_count = 0
+
+    for idx, slide in enumerate(pres.slides, start=1):
+        slide_count = idx
+        slide_parts: list[str] = []
+        for shape in slide.shapes:
+            sh = cast(Any, shape)
+            if not sh.has_text_frame:
+                continue
+            text = sh.text_frame.text
+            if text and text.strip():
+                slide_parts.append(text.strip())
+        if slide_parts:
+            parts.append(f"SLIDE {idx}:\n" + "\n".join(slide_parts))
+
+    return "\n\n".join(parts), slide_count
+
+
+def generate_deck(slides: int, dst: Path) -> Path:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    pres = Presentation()
+    layout = pres.slide_layouts[1]
+    for i in range(slides):
+        slide = pres.slides.add_slide(layout)
+        slide.shapes.title.text = f"Lecture topic {i}"
+        body = slide.placeholders[1].text_frame
+        for j in range(8):
+            body.add_paragraph().text = f"Bullet {j} about concept {i}.{j} " * 3
+        table = slide.shapes.add_table(
+            4, 3, Inches(1), Inches(5), Inches(6), Inches(1.5)
+        ).table
+        for r in range(4):
+            for c in range(3):
+                table.cell(r, c).text = f"r{r}c{c}"
+        slide.notes_slide.notes_text_frame.text = f"Speaker notes for slide {i}"
+    pres.save(str(dst))
+    return dst
+
+
+def measure(fn: Callable[[str], tuple[str, int]], path: str, repeat: int) -> dict:
+    times: list[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    text, slides = fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(times),
+        "peak_mb": peak / 1e6,
+        "chars": len(text),
+        "slides": slides,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--generate", type=int, default=0, help="slides in deck")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = list(args.paths)
+    if args.generate:
+        tmp = Path(tempfile.mkdtemp()) / f"synthetic-{args.generate}.pptx"
+        paths.append(str(generate_deck(args.generate, tmp)))
+    if not paths:
+        parser.error("pass .pptx paths or --generate N")
+
+    impls = {
+        "ooxml-stream": extract_text_from_pptx,
+        "python-pptx": extract_text_from_pptx_python_pptx,
+    }
+    print(f"{'file':<32} {'impl':<14} {'median_s':>9} {'peak_mb':>8} {'chars':>9}")
+    for path in paths:
+        for name, fn in impls.items():
+            r = measure(fn, path, args.repeat)
+            print(
+                f"{Path(path).name[:32]:<32} {name:<14} "
+                f"{r['median_s']:>9.4f} {r['peak_mb']:>8.2f} {r['chars']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Import-time report for the API entry points, using `python -X importtime`.
+
+    python bench/import_time.py                      # server, crud_server, server2
+    python bench/import_time.py server --top 25
+    python bench/import_time.py --also ollama pypdf  # force heavy paths too
+
+Each module is imported in a fresh interpreter, so numbers are cold-start
+costs. Prints the total, then every top-level package (fastapi, psycopg,
+routers, ...) with its own import time summed over all of its modules and
+its cumulative time, i.e. including the packages it pulled in.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_time(module: str, also: list[str]) -> list[tuple[int, int, int, str]]:
+    """Returns (self_us, cumulative_us, depth, name) for every import line."""
+    code = "; ".join(f"import {m}" for m in [module, *also])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:]
+        raise RuntimeError(f"importing {module} failed: {' '.join(last)}")
+
+    rows: list[tuple[int, int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m is not None:
+            depth = len(m.group(3)) // 2
+            rows.append((int(m.group(1)), int(m.group(2)), depth, m.group(4)))
+    return rows
+
+
+def per_package(
+    rows: list[tuple[int, int, int, str]],
+) -> tuple[int, dict[str, list[int]]]:
+    """
+    Returns (total_us, {package: [self_us, cumulative_us]}). Self time is the
+    sum over the package's own modules. Cumulative time adds the cumulative
+    time of each place another package imported it, so nested imports of its
+    own submodules are not counted twice.
+    """
+    total = sum(cumulative for _, cumulative, depth, _ in rows if depth == 0)
+    packages: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    # -X importtime prints children before their parent; walk it backwards
+    # so the parent of a depth-d line is the last depth d-1 line seen
+    parents: list[str] = []
+    for self_us, cumulative, depth, name in reversed(rows):
+        del parents[depth:]
+        package = name.partition(".")[0]
+        parent = parents[-1].partition(".")[0] if parents else None
+        packages[package][0] += self_us
+        if parent != package:
+            packages[package][1] += cumulative
+        parents.append(name)
+    return total, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold import-time report")
+    parser.add_argument(
+        "modules", nargs="*", default=["server", "crud_server", "server2"]
+    )
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--also", nargs="*", default=[], help="extra imports")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            rows = import_time(module, args.also)
+        except RuntimeError as e:
+            print(f"{module}: {e}\n")
+            continue
+
+        total, packages = per_package(rows)
+        print(f"{module}: {total / 1000:.1f} ms total")
+        print(f"  {'self':>8}     {'cumul.':>8}")
+        ranked = sorted(packages.items(), key=lambda kv: -kv[1][1])
+        for name, (self_us, cumulative) in ranked[: args.top]:
+            print(f"  {self_us / 1000:>8.1f} ms  {cumulative / 1000:>8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
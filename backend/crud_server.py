@@ -0,0 +1,12 @@
+"""
+CRUD-only worker: `uvicorn crud_server:app`.
+
+Same routes as server.py minus POST /conversations/{id}/messages, so it
+boots without touching the LLM stack and can be scaled separately from
+the generation workers. Uploads are not summarized here; the generation
+workers' summary sweep picks them up.
+"""
+
+from api import create_app
+
+app = create_app(include_chat=False)
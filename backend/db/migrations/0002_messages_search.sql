@@ -0,0 +1,7 @@
+-- Full-text search over message bodies (GET /search)
+ALTER TABLE messages
+  ADD COLUMN IF NOT EXISTS content_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_messages_content_tsv
+  ON messages USING GIN (content_tsv);
@@ -0,0 +1,52 @@
+-- Files attached to a conversation. Until now this table was created by hand
+-- on each deployment, so bring whatever exists up to the expected shape.
+CREATE TABLE IF NOT EXISTS conversation_files (
+  id              bigserial PRIMARY KEY,
+  conversation_id uuid NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+  filename        text NOT NULL,
+  mime_type       text,
+  size_bytes      bigint,
+  storage_path    text NOT NULL,
+  created_at      timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE conversation_files
+  ADD COLUMN IF NOT EXISTS content_sha256    text,
+  ADD COLUMN IF NOT EXISTS page_count        integer,
+  ADD COLUMN IF NOT EXISTS extracted_text    text,
+  ADD COLUMN IF NOT EXISTS text_extracted_at timestamptz;
+
+ALTER TABLE conversation_files
+  ADD COLUMN IF NOT EXISTS extracted_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple', coalesce(extracted_text, ''))) STORED;
+
+-- Hand-made tables often lack the cascade; recreate the FK so deleting a
+-- conversation always removes its file rows.
+DO $$
+DECLARE
+  fk_name text;
+BEGIN
+  FOR fk_name IN
+    SELECT conname FROM pg_constraint
+    WHERE conrelid = 'conversation_files'::regclass
+      AND confrelid = 'conversations'::regclass
+      AND contype = 'f'
+  LOOP
+    EXECUTE format('ALTER TABLE conversation_files DROP CONSTRAINT %I', fk_name);
+  END LOOP;
+END $$;
+
+ALTER TABLE conversation_files
+  ADD CONSTRAINT conversation_files_conversation_id_fkey
+  FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE;
+
+-- Ordered reads per conversation (build_files_context, list_conversation_files)
+CREATE INDEX IF NOT EXISTS idx_conversation_files_conversation_id_id
+  ON conversation_files(conversation_id, id);
+
+-- Reconciling UPLOAD_DIR against the table looks files up by path
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conversation_files_storage_path
+  ON conversation_files(storage_path);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_files_extracted_tsv
+  ON conversation_files USING GIN (extracted_tsv);
@@ -0,0 +1,20 @@
+-- Precomputed summaries for hierarchical context compression.
+-- Each file is split into sections (groups of slides/pages); every section
+-- gets a summary and the file gets a summary of those (map-reduce).
+ALTER TABLE conversation_files
+  ADD COLUMN IF NOT EXISTS summary       text,
+  ADD COLUMN IF NOT EXISTS summarized_at timestamptz;
+
+CREATE TABLE IF NOT EXISTS file_sections (
+  id           bigserial PRIMARY KEY,
+  file_id      bigint NOT NULL REFERENCES conversation_files(id) ON DELETE CASCADE,
+  section_idx  integer NOT NULL,
+  label        text NOT NULL, -- e.g. "SLIDE 4-9"
+  content      text NOT NULL,
+  summary      text,
+  content_tsv  tsvector GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED,
+  UNIQUE (file_id, section_idx)
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_sections_content_tsv
+  ON file_sections USING GIN (content_tsv);
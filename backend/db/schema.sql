@@ -1,3 +1,6 @@
+-- Snapshot of the full schema for fresh installs.
+-- Existing databases are upgraded with: python db/migrate.py (db/migrations/*.sql)
+
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
 
 -- Users (skip if you already have one)
@@ -25,9 +28,58 @@ CREATE TABLE messages (
   conversation_id uuid NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
   role            text NOT NULL CHECK (role IN ('user','assistant','system')),
   content         text NOT NULL,
-  created_at      timestamptz NOT NULL DEFAULT now()
+  created_at      timestamptz NOT NULL DEFAULT now(),
+  -- full-text search; 'simple' config because chats mix PT/EN
+  content_tsv     tsvector GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED
 );
 
 -- Fast pagination and ordered reads per conversation [web:156]
 CREATE INDEX idx_messages_conversation_id_id
   ON messages(conversation_id, id);
+
+-- Full-text search over message bodies (GET /search)
+CREATE INDEX idx_messages_content_tsv
+  ON messages USING GIN (content_tsv);
+
+-- Files attached to a conversation (text is extracted once, at upload)
+CREATE TABLE conversation_files (
+  id                bigserial PRIMARY KEY,
+  conversation_id   uuid NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+  filename          text NOT NULL,
+  mime_type         text,
+  size_bytes        bigint,
+  storage_path      text NOT NULL,
+  created_at        timestamptz NOT NULL DEFAULT now(),
+  content_sha256    text,
+  page_count        integer,
+  extracted_text    text,
+  text_extracted_at timestamptz,
+  extracted_tsv     tsvector GENERATED ALWAYS AS (to_tsvector('simple', coalesce(extracted_text, ''))) STORED,
+  summary           text,
+  summarized_at     timestamptz
+);
+
+CREATE INDEX idx_conversation_files_conversation_id_id
+  ON conversation_files(conversation_id, id);
+
+CREATE UNIQUE INDEX idx_conversation_files_storage_path
+  ON conversation_files(storage_path);
+
+CREATE INDEX idx_conversation_files_extracted_tsv
+  ON conversation_files USING GIN (extracted_tsv);
+
+-- Sections of a file (groups of slides/pages) with their own summaries,
+-- used to keep prompts small when a conversation has many files
+CREATE TABLE file_sections (
+  id           bigserial PRIMARY KEY,
+  file_id      bigint NOT NULL REFERENCES conversation_files(id) ON DELETE CASCADE,
+  section_idx  integer NOT NULL,
+  label        text NOT NULL, -- e.g. "SLIDE 4-9"
+  content      text NOT NULL,
+  summary      text,
+  content_tsv  tsvector GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED,
+  UNIQUE (file_id, section_idx)
+);
+
+CREATE INDEX idx_file_sections_content_tsv
+  ON file_sections USING GIN (content_tsv);
@@ -0,0 +1,102 @@
+"""
+Per-user live events over Postgres LISTEN/NOTIFY.
+
+Writers call notify_user()/notify_conversation() inside the same transaction
+as the change, so an event is delivered only if the change commits, and to
+every API worker (each one LISTENs on one connection and fans events out to
+its own WebSocket subscribers).
+
+Payloads are small (ids, titles, timestamps): NOTIFY is capped at 8000 bytes,
+so clients fetch bodies themselves, e.g. messages via after_id.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+
+import orjson
+import psycopg
+
+from db import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "jorge_events"
+
+# user_id -> queues of that user's connected sockets (this worker only)
+subscribers: "defaultdict[str, set[asyncio.Queue]]" = defaultdict(set)
+
+
+def notify_user(cur, user_id: str, event_type: str, data: dict) -> None:
+    payload = orjson.dumps({"user_id": str(user_id), "type": event_type, "data": data})
+    cur.execute("SELECT pg_notify(%s, %s)", (EVENTS_CHANNEL, payload.decode()))
+
+
+def notify_conversation(cur, conversation_id: str, event_type: str, data: dict) -> None:
+    """Same as notify_user, resolving the owner from the conversation id."""
+    cur.execute(
+        """
+        SELECT pg_notify(
+            %s,
+            json_build_object(
+                'user_id', user_id, 'type', %s::text, 'data', %s::json
+            )::text
+        )
+        FROM conversations
+        WHERE id = %s
+        """,
+        (EVENTS_CHANNEL, event_type, orjson.dumps(data).decode(), conversation_id),
+    )
+
+
+def subscribe(user_id: str) -> asyncio.Queue:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+    subscribers[user_id].add(queue)
+    return queue
+
+
+def unsubscribe(user_id: str, queue: asyncio.Queue) -> None:
+    queues = subscribers.get(user_id)
+    if queues is not None:
+        queues.discard(queue)
+        if not queues:
+            del subscribers[user_id]
+
+
+def dispatch(payload: str) -> None:
+    try:
+        event = orjson.loads(payload)
+    except ValueError:
+        return
+    user_id = event.pop("user_id", None)
+    for queue in list(subscribers.get(user_id, ())):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # slow client: tell it to resync instead of buffering forever
+            queue.get_nowait()
+            queue.put_nowait({"type": "resync", "data": {}})
+
+
+async def listen_forever() -> None:
+    delay = 1.0
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                DATABASE_URL, autocommit=True
+            ) as conn:
+                await conn.execute(f"LISTEN {EVENTS_CHANNEL}")
+                delay = 1.0
+                async for notify in conn.notifies():
+                    dispatch(notify.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("event listener lost its connection; retrying")
+        # events sent while disconnected are lost: ask everyone to resync
+        for queues in list(subscribers.values()):
+            for queue in list(queues):
+                if queue.empty():
+                    queue.put_nowait({"type": "resync", "data": {}})
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
@@ -0,0 +1,158 @@
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Optional
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+# OOXML namespaces used by the PPTX extractor
+NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+NS_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+NS_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+NOTES_REL_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide"
+)
+# notes pages repeat the slide number/header/footer as placeholders
+NOTES_SKIP_PLACEHOLDERS = frozenset({"sldNum", "hdr", "ftr", "dt", "sldImg"})
+
+
+def _pptx_rels(zf: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """rId -> (type, absolute part name) for one part's .rels file."""
+    rels_name = posixpath.join(
+        posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels"
+    )
+    if rels_name not in zf.NameToInfo:
+        return {}
+    rels: dict[str, tuple[str, str]] = {}
+    root = ET.parse(zf.open(rels_name)).getroot()
+    for rel in root.iter(f"{NS_REL}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue  # hyperlinks etc.: not a part of this package
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            # absolute part name, relative to the package root
+            target = posixpath.normpath(target.lstrip("/"))
+        else:
+            target = posixpath.normpath(
+                posixpath.join(posixpath.dirname(part), target)
+            )
+        rels[rel.get("Id", "")] = (rel.get("Type", ""), target)
+    return rels
+
+
+def _pptx_part_lines(
+    zf: zipfile.ZipFile, part: str, skip_placeholders: frozenset[str] = frozenset()
+) -> list[str]:
+    """
+    Streams one slide/notes part and returns its text lines: one per
+    paragraph, and one per table row with cells joined by ' | '.
+    Covers grouped shapes too, since every a:p is visited wherever it sits.
+    """
+    lines: list[str] = []
+    para: list[str] = []
+    row: Optional[list[str]] = None
+    cell: Optional[list[str]] = None
+    skip_depth = 0  # >0 while inside a skipped placeholder shape
+    sp_depth = 0
+
+    for event, el in ET.iterparse(zf.open(part), events=("start", "end")):
+        tag = el.tag
+        if event == "start":
+            if tag == f"{NS_P}sp":
+                sp_depth += 1
+            elif tag == f"{NS_P}ph" and el.get("type") in skip_placeholders:
+                skip_depth = sp_depth
+            elif tag == f"{NS_A}tr":
+                row = []
+            elif tag == f"{NS_A}tc":
+                cell = []
+            continue
+
+        if tag == f"{NS_A}t":
+            para.append(el.text or "")
+        elif tag == f"{NS_A}br":
+            para.append("\n")
+        elif tag == f"{NS_A}p":
+            text = "".join(para).strip()
+            para = []
+            if text and not skip_depth:
+                if cell is not None:
+                    cell.append(text)
+                else:
+                    lines.append(text)
+            el.clear()
+        elif tag == f"{NS_A}tc":
+            if row is not None and cell is not None:
+                row.append(" ".join(cell))
+            cell = None
+        elif tag == f"{NS_A}tr":
+            if row and any(row):
+                lines.append(" | ".join(row))
+            row = None
+            el.clear()
+        elif tag == f"{NS_P}sp":
+            if skip_depth == sp_depth:
+                skip_depth = 0
+            sp_depth -= 1
+            el.clear()
+
+    return lines
+
+
+def extract_text_from_pptx(path: str) -> tuple[str, int]:
+    """
+    Reads slide text straight from the OOXML parts with iterparse instead of
+    building the python-pptx object model. Includes tables, grouped shapes
+    and speaker notes. Returns (text, slide_count).
+    """
+    parts: list[str] = []
+
+    with zipfile.ZipFile(path) as zf:
+        pres_part = "ppt/presentation.xml"
+        pres_rels = _pptx_rels(zf, pres_part)
+        slides: list[str] = []
+        for sld in ET.parse(zf.open(pres_part)).getroot().iter(f"{NS_P}sldId"):
+            rel = pres_rels.get(sld.get(f"{NS_R}id", ""))
+            if rel is not None and rel[1] in zf.NameToInfo:
+                slides.append(rel[1])
+
+        for idx, slide_part in enumerate(slides, start=1):
+            slide_lines = _pptx_part_lines(zf, slide_part)
+
+            notes_lines: list[str] = []
+            for rel_type, target in _pptx_rels(zf, slide_part).values():
+                if rel_type == NOTES_REL_TYPE and target in zf.NameToInfo:
+                    notes_lines = _pptx_part_lines(zf, target, NOTES_SKIP_PLACEHOLDERS)
+
+            if notes_lines:
+                slide_lines = slide_lines + ["NOTES:"] + notes_lines
+            if slide_lines:
+                parts.append(f"SLIDE {idx}:\n" + "\n".join(slide_lines))
+
+    return "\n\n".join(parts), len(slides)
+
+
+def extract_text_for_file(mime: str, path: str) -> tuple[str, Optional[int]]:
+    """Returns (text, page_count); page_count is None for unsupported types."""
+    p = Path(path)
+
+    if mime == "application/pdf":
+        from pypdf import PdfReader  # for PDFs [web:886]; imported lazily
+
+        reader = PdfReader(str(p))
+        pages: list[str] = []
+        for idx, page in enumerate(reader.pages, start=1):
+            page_text = (page.extract_text() or "").strip()
+            if page_text:
+                # same shape as SLIDE n: so sections/grounding can cite pages
+                pages.append(f"PAGE {idx}:\n{page_text}")
+        return "\n\n".join(pages), len(reader.pages)
+
+    if mime == PPTX_MIME:
+        return extract_text_from_pptx(str(p))
+
+    # images: not processed yet
+    return "", None
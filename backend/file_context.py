@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Optional
+
+from db import get_conn
+from extraction import extract_text_for_file
+from llm import GENERATION_METRICS, get_ollama_client
+from prompts import strip_thinking
+
+logger = logging.getLogger(__name__)
+
+# file text budget in the chat prompt; summaries only matter above it
+FILES_CONTEXT_MAX_CHARS = 12000
+
+
+def build_files_context(
+    conversation_id: str, max_chars: int = FILES_CONTEXT_MAX_CHARS, query: str = ""
+) -> str:
+    """
+    Full text of every file when it fits in max_chars. Otherwise: the
+    precomputed summary of every file, then full text of the sections that
+    best match `query` until the budget is used.
+    """
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, filename, mime_type, storage_path, extracted_text,
+                   text_extracted_at, summary
+            FROM conversation_files
+            WHERE conversation_id = %s
+            ORDER BY id ASC
+            """,
+            (conversation_id,),
+        )
+        rows = cur.fetchall()
+
+        files: list[tuple[str, str, Optional[str]]] = []
+        for row in rows:
+            file_id, filename, mime, storage_path, text, extracted_at, summary = row
+            if extracted_at is None:
+                # uploaded before text was cached at upload time: backfill once
+                try:
+                    text, page_count = extract_text_for_file(
+                        mime or "", storage_path
+                    )
+                except Exception:
+                    # still NULL, so the next send tries again
+                    logger.warning(
+                        "text extraction failed for file %s", file_id, exc_info=True
+                    )
+                    continue
+                cur.execute(
+                    """
+                    UPDATE conversation_files
+                    SET extracted_text = %s, page_count = %s,
+                        text_extracted_at = now()
+                    WHERE id = %s
+                    """,
+                    (text, page_count, file_id),
+                )
+            if text and text.strip():
+                files.append((filename, text.strip(), summary))
+        conn.commit()
+
+        ctx = "\n\n---\n\n".join(
+            f"FILE: {filename}\n{text}" for filename, text, _ in files
+        )
+        if len(ctx) <= max_chars:
+            return ctx
+
+        # Over budget: summaries for all files (files still being summarized
+        # get an equal slice of their raw text instead).
+        share = max_chars // (2 * len(files))
+        summary_blocks = [
+            f"FILE: {filename} (summary)\n{summary or text[:share]}"
+            for filename, text, summary in files
+        ]
+        ctx = "\n\n---\n\n".join(summary_blocks)
+        if len(ctx) >= max_chars:
+            return ctx[:max_chars]
+
+        words = [w for w in re.findall(r"\w+", query.lower()) if len(w) > 2]
+        cur.execute(
+            """
+            SELECT f.filename, s.label, s.content
+            FROM file_sections s
+            JOIN conversation_files f ON f.id = s.file_id
+            WHERE f.conversation_id = %s
+            ORDER BY ts_rank_cd(s.content_tsv, to_tsquery('simple', %s)) DESC,
+                     s.file_id, s.section_idx
+            """,
+            (conversation_id, " | ".join(words) or "''"),
+        )
+        sections = cur.fetchall()
+
+    budget = max_chars - len(ctx)
+    relevant: list[str] = []
+    for filename, label, content in sections:
+        block = f"\n\n---\n\nFILE: {filename} ({label})\n{content.strip()}"
+        if len(block) <= budget:
+            relevant.append(block)
+            budget -= len(block)
+
+    return ctx + "".join(relevant)
+
+
+# small model: summaries share the Ollama slot with chat replies
+SUMMARY_MODEL = os.environ.get("SUMMARY_MODEL", "qwen3:0.6b")
+SECTION_MAX_CHARS = 4000
+SECTION_MARKER_RE = re.compile(r"(?m)^(SLIDE|PAGE) (\d+):$")
+
+
+def split_into_sections(
+    text: str, max_chars: int = SECTION_MAX_CHARS
+) -> list[tuple[str, str]]:
+    """
+    Groups consecutive SLIDE n:/PAGE n: blocks into (label, content) sections
+    of at most max_chars (a single oversized slide stays on its own).
+    Text before the first marker becomes its own INTRO section. Text without
+    markers is cut into PART n chunks on paragraph boundaries.
+    """
+    sections: list[tuple[str, str]] = []
+    markers = list(SECTION_MARKER_RE.finditer(text))
+    if markers:
+        intro = text[: markers[0].start()].strip()
+        if intro:
+            sections.append(("INTRO", intro))
+        units = [
+            (m.group(1), int(m.group(2)), text[m.start() : nxt].strip())
+            for m, nxt in zip(
+                markers, [m.start() for m in markers[1:]] + [len(text)]
+            )
+        ]
+    else:
+        units = [("PART", i, p) for i, p in enumerate(text.split("\n\n"), start=1)]
+
+    group: list[tuple[str, int, str]] = []
+    size = 0
+
+    def close_group():
+        kind, first = group[0][0], group[0][1]
+        last = group[-1][1]
+        label = f"{kind} {first}" if first == last else f"{kind} {first}-{last}"
+        sections.append((label, "\n\n".join(u[2] for u in group)))
+
+    for unit in units:
+        if group and size + len(unit[2]) > max_chars:
+            close_group()
+            group, size = [], 0
+        group.append(unit)
+        size += len(unit[2])
+    if group:
+        close_group()
+
+    if not markers:
+        # PART numbers are paragraph indexes; renumber by section
+        sections = [(f"PART {i}", c) for i, (_, c) in enumerate(sections, start=1)]
+    return sections
+
+
+async def summarize_text(instruction: str, text: str, num_predict: int) -> str:
+    # interactive replies first (this worker only; others share the slot too)
+    while GENERATION_METRICS["in_flight"]:
+        await asyncio.sleep(SUMMARY_IDLE_POLL_S)
+    resp = await get_ollama_client().chat(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": instruction},
+            {"role": "user", "content": text},
+        ],
+        think=False,
+        options={"num_predict": num_predict, "temperature": 0.2},
+        stream=False,
+    )
+    return strip_thinking(resp.message.content or "").strip()
+
+
+SECTION_SUMMARY_PROMPT = (
+    "Summarize this part of a course file for a student in at most 5 short "
+    "bullet points. Keep key terms, definitions and formulas. Mention the "
+    "slide/page numbers. No introduction."
+)
+FILE_SUMMARY_PROMPT = (
+    "These are summaries of consecutive parts of one course file. Write one "
+    "compact overview of the whole file (max 12 bullet points) keeping the "
+    "main topics, key terms and which slides/pages cover them. No introduction."
+)
+
+
+SUMMARY_LOCK_CLASS = 7_420_034  # advisory lock namespace, one lock per file
+# 0 disables the periodic sweep for files still without a summary
+SUMMARY_SWEEP_INTERVAL_S = int(os.environ.get("SUMMARY_SWEEP_INTERVAL_S", "60"))
+SUMMARY_SWEEP_BATCH = 20
+SUMMARY_IDLE_POLL_S = 1.0
+
+
+async def summarize_file(file_id: int) -> None:
+    """
+    Offline map-reduce: split the cached text into sections, summarize each
+    (map), then fold the section summaries into one file summary (reduce).
+    Runs from summary_worker, off the request path; failures only leave the
+    file without a summary, in which case build_files_context uses raw text
+    and the next sweep tries again.
+    """
+    try:
+        with get_conn() as lock_conn:
+            lock_conn.autocommit = True
+            # the upload task and the sweep (in any worker) may pick the same file
+            locked = lock_conn.execute(
+                "SELECT pg_try_advisory_lock(%s, (%s %% 2147483647)::int)",
+                (SUMMARY_LOCK_CLASS, file_id),
+            ).fetchone()[0]
+            if locked:
+                await _summarize_file(file_id)
+    except Exception:
+        logger.exception("summarizing file %s failed", file_id)
+
+
+async def _summarize_file(file_id: int) -> None:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT extracted_text, summarized_at FROM conversation_files "
+            "WHERE id = %s",
+            (file_id,),
+        )
+        row = cur.fetchone()
+        if row is None or row[1] is not None or not (row[0] or "").strip():
+            return
+        sections = split_into_sections(row[0])
+
+        cur.execute("DELETE FROM file_sections WHERE file_id = %s", (file_id,))
+        cur.executemany(
+            """
+            INSERT INTO file_sections (file_id, section_idx, label, content)
+            VALUES (%s, %s, %s, %s)
+            """,
+            [
+                (file_id, i, label, content)
+                for i, (label, content) in enumerate(sections)
+            ],
+        )
+        conn.commit()
+
+    # map
+    partials: list[str] = []
+    for i, (label, content) in enumerate(sections):
+        summary = await summarize_text(SECTION_SUMMARY_PROMPT, content, 200)
+        partials.append(f"{label}:\n{summary}")
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE file_sections SET summary = %s
+                WHERE file_id = %s AND section_idx = %s
+                """,
+                (summary, file_id, i),
+            )
+            conn.commit()
+
+    # reduce (several rounds if the partial summaries are still too long)
+    while (
+        len(partials) > 1 and sum(len(p) for p in partials) > SECTION_MAX_CHARS
+    ):
+        # pack consecutive partials (they keep their labels) into
+        # SECTION_MAX_CHARS groups and summarize each group
+        grouped: list[list[str]] = [[]]
+        size = 0
+        for partial in partials:
+            if grouped[-1] and size + len(partial) > SECTION_MAX_CHARS:
+                grouped.append([])
+                size = 0
+            grouped[-1].append(partial)
+            size += len(partial)
+        partials = [
+            await summarize_text(FILE_SUMMARY_PROMPT, "\n\n".join(group), 300)
+            for group in grouped
+        ]
+    file_summary = await summarize_text(
+        FILE_SUMMARY_PROMPT, "\n\n".join(partials), 400
+    )
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE conversation_files
+            SET summary = %s, summarized_at = now()
+            WHERE id = %s
+            """,
+            (file_summary, file_id),
+        )
+        conn.commit()
+
+
+async def summarize_pending(batch_size: int = SUMMARY_SWEEP_BATCH) -> int:
+    """
+    Summarizes files that have text but no summary yet (uploads, backfilled
+    and imported files). Conversations whose files fit in
+    FILES_CONTEXT_MAX_CHARS are skipped: build_files_context sends their full
+    text and never reads summaries. Returns how many files were picked.
+    """
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id FROM conversation_files
+            WHERE summarized_at IS NULL
+              AND btrim(coalesce(extracted_text, '')) <> ''
+              AND conversation_id IN (
+                SELECT conversation_id
+                FROM conversation_files
+                WHERE conversation_id IN (
+                  SELECT conversation_id FROM conversation_files
+                  WHERE summarized_at IS NULL
+                )
+                GROUP BY conversation_id
+                HAVING sum(length(coalesce(extracted_text, ''))) > %s
+              )
+            ORDER BY id
+            LIMIT %s
+            """,
+            (FILES_CONTEXT_MAX_CHARS, batch_size),
+        )
+        file_ids = [r[0] for r in cur.fetchall()]
+    for file_id in file_ids:
+        await summarize_file(file_id)
+    return len(file_ids)
+
+
+async def summary_worker(interval_s: int = SUMMARY_SWEEP_INTERVAL_S) -> None:
+    while True:
+        try:
+            await summarize_pending()
+        except Exception:
+            logger.exception("summary sweep failed")
+        await asyncio.sleep(interval_s)
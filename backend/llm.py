@@ -0,0 +1,36 @@
+_ollama_client = None
+
+
+def get_ollama_client():
+    """Shared AsyncClient (honours OLLAMA_HOST), imported on first use."""
+    global _ollama_client
+    if _ollama_client is None:
+        from ollama import AsyncClient
+
+        _ollama_client = AsyncClient()
+    return _ollama_client
+
+
+# how often send_message checks whether the client is still there
+DISCONNECT_POLL_S = 0.5
+
+# in-process counters, exposed at GET /metrics/generation
+GENERATION_METRICS = {
+    "completed": 0,
+    "completed_tokens": 0,
+    "cancelled": 0,
+    "cancelled_tokens_generated": 0,
+    "cancelled_tokens_saved_estimate": 0,
+    # replies streaming right now; file summaries wait while this is > 0
+    "in_flight": 0,
+}
+
+
+def record_cancelled_generation(tokens_generated: int) -> None:
+    m = GENERATION_METRICS
+    m["cancelled"] += 1
+    m["cancelled_tokens_generated"] += tokens_generated
+    # savings = what an average completed answer would still have produced
+    if m["completed"]:
+        avg = m["completed_tokens"] // m["completed"]
+        m["cancelled_tokens_saved_estimate"] += max(avg - tokens_generated, 0)
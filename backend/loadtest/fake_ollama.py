@@ -0,0 +1,97 @@
+"""
+Minimal stand-in for the Ollama HTTP API, for load tests.
+
+Implements POST /api/chat (streaming NDJSON and non-streaming) with a
+configurable per-token delay and a limited number of parallel slots, like a
+real Ollama box with OLLAMA_NUM_PARALLEL. Point the API at it with
+OLLAMA_HOST=http://127.0.0.1:11435.
+
+    python loadtest/fake_ollama.py --port 11435 --token-latency-ms 25 --parallel 1
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+WORDS = (
+    "## 📝 Summary - **Key** concept example practice question answer slide "
+    "study plan review definition formula note"
+).split()
+
+app = FastAPI()
+config = {"token_latency_s": 0.02, "tokens": 300, "jitter": 0.2}
+slots = asyncio.Semaphore(1)
+
+
+def _chunk(model: str, content: str, done: bool, **extra) -> dict:
+    return {
+        "model": model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+        **extra,
+    }
+
+
+async def _tokens(n: int):
+    for _ in range(n):
+        jitter = 1 + random.uniform(-config["jitter"], config["jitter"])
+        await asyncio.sleep(config["token_latency_s"] * jitter)
+        yield random.choice(WORDS) + " "
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = orjson.loads(await request.body())
+    model = body.get("model", "fake")
+    options = body.get("options") or {}
+    n = min(int(options.get("num_predict") or config["tokens"]), config["tokens"])
+    stream = body.get("stream", True)
+
+    if not stream:
+        async with slots:
+            text = "".join([t async for t in _tokens(n)])
+        return Response(
+            orjson.dumps(
+                _chunk(model, text, True, done_reason="stop", eval_count=n)
+            ),
+            media_type="application/json",
+        )
+
+    async def gen():
+        # holding the slot inside the generator mirrors Ollama: the slot is
+        # freed as soon as the client closes the stream
+        async with slots:
+            async for t in _tokens(n):
+                yield orjson.dumps(_chunk(model, t, False)) + b"\n"
+            yield orjson.dumps(
+                _chunk(model, "", True, done_reason="stop", eval_count=n)
+            ) + b"\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": "qwen3:4b"}]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-latency-ms", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=300, help="tokens per reply")
+    parser.add_argument("--parallel", type=int, default=1, help="generation slots")
+    args = parser.parse_args()
+
+    config["token_latency_s"] = args.token_latency_ms / 1000
+    config["tokens"] = args.tokens
+    slots = asyncio.Semaphore(args.parallel)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,171 @@
+"""
+Asyncio load generator for the API (server.py).
+
+Each virtual student: creates a conversation, sometimes uploads one of the
+sample PDFs, sends a few messages with random intent/output_mode, lists
+conversations and re-reads messages with think time in between, then
+deletes the conversation. Run the API against loadtest/fake_ollama.py to
+measure the service itself rather than the model.
+
+    OLLAMA_HOST=http://127.0.0.1:11435 uvicorn server:app --port 8000
+    python loadtest/fake_ollama.py --port 11435
+    python loadtest/loadgen.py --user-id <uuid> --users 50 --duration 120
+
+Reports requests, errors, throughput and p50/p95/p99 latency per endpoint.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+# copies of the PDFs in uploads/; never read from UPLOAD_DIR, whose files
+# belong to conversation_files rows and to the upload GC
+SAMPLE_DIR = Path(__file__).resolve().parent / "samples"
+INTENTS = ["summary", "study_plan", "practice_questions", "custom"]
+OUTPUT_MODES = ["quick", "full", "study_ready"]
+QUESTIONS = [
+    "Summarize the main ideas of these slides.",
+    "Make me a study plan for the exam next week.",
+    "Give me practice questions about the second chapter.",
+    "Explain the hardest concept in simple terms.",
+]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'endpoint':<24} {'reqs':>6} {'err%':>6} {'rps':>7} "
+            f"{'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}"
+        ]
+        for name in sorted(self.latencies):
+            lat = sorted(self.latencies[name])
+            n = len(lat)
+            lines.append(
+                f"{name:<24} {n:>6} {100 * self.errors[name] / n:>6.1f} "
+                f"{n / elapsed:>7.2f} {pct(lat, 50):>8.0f} "
+                f"{pct(lat, 95):>8.0f} {pct(lat, 99):>8.0f}"
+            )
+        return "\n".join(lines)
+
+
+def pct(sorted_values: list[float], p: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx] * 1000
+
+
+async def timed(stats: Stats, name: str, coro) -> httpx.Response | None:
+    t0 = time.perf_counter()
+    try:
+        resp = await coro
+    except httpx.HTTPError:
+        stats.record(name, time.perf_counter() - t0, ok=False)
+        return None
+    stats.record(name, time.perf_counter() - t0, ok=resp.status_code < 400)
+    return resp
+
+
+async def student(
+    client: httpx.AsyncClient, stats: Stats, args, deadline: float
+) -> None:
+    samples = sorted(SAMPLE_DIR.glob("*.pdf"))
+    while time.monotonic() < deadline:
+        resp = await timed(
+            stats,
+            "POST /conversations",
+            client.post("/conversations", json={"user_id": args.user_id}),
+        )
+        if resp is None or resp.status_code >= 400:
+            await asyncio.sleep(1)
+            continue
+        convo_id = resp.json()["conversation"]["id"]
+
+        if samples and random.random() < args.upload_ratio:
+            pdf = random.choice(samples)
+            await timed(
+                stats,
+                "POST files",
+                client.post(
+                    f"/conversations/{convo_id}/files",
+                    files={"file": (pdf.name, pdf.read_bytes(), "application/pdf")},
+                ),
+            )
+
+        for _ in range(random.randint(1, args.messages)):
+            if time.monotonic() >= deadline:
+                break
+            await timed(
+                stats,
+                "POST messages",
+                client.post(
+                    f"/conversations/{convo_id}/messages",
+                    json={
+                        "content": random.choice(QUESTIONS),
+                        "intent": random.choice(INTENTS),
+                        "output_mode": random.choice(OUTPUT_MODES),
+                    },
+                ),
+            )
+            await timed(
+                stats,
+                "GET conversations",
+                client.get("/conversations", params={"user_id": args.user_id}),
+            )
+            await timed(
+                stats,
+                "GET messages",
+                client.get(f"/conversations/{convo_id}/messages", params={"limit": 50}),
+            )
+            await asyncio.sleep(random.uniform(0, args.think_time))
+
+        await timed(
+            stats, "DELETE conversation", client.delete(f"/conversations/{convo_id}")
+        )
+
+
+async def main(args) -> None:
+    stats = Stats()
+    limits = httpx.Limits(
+        max_connections=args.users, max_keepalive_connections=args.users
+    )
+    timeout = httpx.Timeout(args.timeout)
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=timeout
+    ) as client:
+        tasks = []
+        for _ in range(args.users):
+            tasks.append(asyncio.create_task(student(client, stats, args, deadline)))
+            await asyncio.sleep(args.ramp_up / max(args.users, 1))
+        await asyncio.gather(*tasks)
+
+    print(stats.report(time.monotonic() - started))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Jorge API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", required=True, help="existing users.id")
+    parser.add_argument("--users", type=int, default=10, help="concurrent students")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=10, help="seconds")
+    parser.add_argument("--messages", type=int, default=4, help="max per convo")
+    parser.add_argument("--upload-ratio", type=float, default=0.5)
+    parser.add_argument("--think-time", type=float, default=3, help="max seconds")
+    parser.add_argument("--timeout", type=float, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,238 @@
+import re
+from typing import Literal
+
+def build_system_prompt(
+    intent: Literal["summary", "study_plan", "practice_questions", "custom"],
+    output_mode: Literal["quick", "full", "study_ready"],
+    files_text: str,
+) -> str:
+    markdown_contract = (
+        "Return using the exact Markdown skeleton for the chosen output mode.\n"
+        "Formatting requirements:\n"
+        "- Use Markdown headings that start with '## ' (exactly).\n"
+        "- Use **bold** for key terms.\n"
+        "- Use '-' for bullet lists and '1.' for ordered lists.\n"
+        "- Keep paragraphs short (2-3 sentences max) for mobile readability.\n"
+        "- Use '---' between major sections.\n"
+        "- Use light emojis at the start of section headers (e.g. ## 📝 Summary).\n"
+    )
+
+    markdown_skeletons = {
+        "quick": (
+            "Markdown skeleton (quick):\n"
+            "## 📝 Summary\n\n"
+            "## 🎯 Key Takeaways\n\n"
+            "## ✅ Quick Practice Questions\n\n"
+            "## ❓ Clarifying Questions (only if needed)\n"
+        ),
+        "full": (
+            "Markdown skeleton (full):\n"
+            "## 📝 Summary\n\n"
+            "---\n\n"
+            "## 🎯 Key Concepts\n\n"
+            "---\n\n"
+            "## 🧪 Examples\n\n"
+            "---\n\n"
+            "## ⚠️ Common Pitfalls\n\n"
+            "---\n\n"
+            "## ✅ Practice Questions\n\n"
+            "---\n\n"
+            "## ❓ Clarifying Questions (only if needed)\n"
+        ),
+        "study_ready": (
+            "Markdown skeleton (study_ready):\n"
+            "## 📝 Summary\n\n"
+            "---\n\n"
+            "## 🗓️ 7-Day Study Plan\n\n"
+            "---\n\n"
+            "## 🧠 Flashcards\n\n"
+            "---\n\n"
+            "## ✅ Quiz\n\n"
+            "---\n\n"
+            "## 📌 Revision Checklist\n\n"
+            "---\n\n"
+            "## ❓ Clarifying Questions (only if needed)\n"
+        ),
+    }
+
+    mode_rules = {
+        "quick": (
+            "Output mode: quick.\n"
+            "- Keep it compact and mobile-friendly.\n"
+            "- Use short bullet points.\n"
+            "- Include exactly 3 key takeaways.\n"
+            "- Include exactly 3 quick practice questions."
+        ),
+        "full": (
+            "Output mode: full.\n"
+            "- Use sections in this order: Summary, Key Concepts, Examples, Common Pitfalls, Practice Questions.\n"
+            "- Keep paragraphs short and scannable.\n"
+            "- Include 5 practice questions with concise answers."
+        ),
+        "study_ready": (
+            "Output mode: study_ready.\n"
+            "- Use sections in this order: Summary, 7-Day Study Plan, Flashcards, Quiz, Revision Checklist.\n"
+            "- Keep it practical and exam-focused.\n"
+            "- Flashcards should be Q/A pairs.\n"
+            "- Quiz should include answers and 1-line explanations."
+        ),
+    }
+
+    intent_rules = {
+        "summary": "Intent focus: prioritize a clean summary and major takeaways before anything else.",
+        "study_plan": "Intent focus: prioritize a concrete study plan with realistic pacing and milestones.",
+        "practice_questions": "Intent focus: prioritize high-quality exam-style questions and answers.",
+        "custom": "Intent focus: answer the user question directly and then add useful study follow-ups.",
+    }
+
+    grounding_rules = (
+        "You are a study assistant.\n"
+        "Grounding requirements:\n"
+        "- Base your answer on the uploaded files whenever possible.\n"
+        "- If information is missing from files, explicitly say what is missing.\n"
+        "- Do not invent slide content.\n"
+        "- When useful, reference slide or page numbers (e.g., SLIDE 3, PAGE 2).\n"
+        "- End with 1-2 concise clarifying questions if user intent is ambiguous.\n"
+    )
+
+    files_block = (
+        files_text.strip() or "No attached files were found for this conversation."
+    )
+
+    return (
+        grounding_rules
+        + "\n"
+        + markdown_contract
+        + "\n"
+        + markdown_skeletons[output_mode]
+        + "\n"
+        + mode_rules[output_mode]
+        + "\n"
+        + intent_rules[intent]
+        + "\n\nCourse file context:\n"
+        + files_block
+    )
+
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+THINK_BLOCK_RE = re.compile(r"<think>.*?(?:</think>|\Z)", re.DOTALL)
+
+
+def strip_thinking(text: str) -> str:
+    """
+    Removes <think>...</think> reasoning blocks (also an unterminated trailing one).
+    Used on old rows that were stored before the filter existed.
+    """
+    if THINK_OPEN not in text:
+        return text
+    return THINK_BLOCK_RE.sub("", text).strip()
+
+
+class ThinkFilter:
+    """
+    Streaming splitter for qwen3 output.
+    Feed it content chunks as they arrive; it returns the answer part and keeps
+    the reasoning in `self.thinking`. Tags split across chunks are buffered.
+    """
+
+    def __init__(self) -> None:
+        self.in_think = False
+        self.thinking = ""
+        self._buf = ""
+
+    def feed(self, chunk: str) -> str:
+        self._buf += chunk
+        out: list[str] = []
+
+        while self._buf:
+            tag = THINK_CLOSE if self.in_think else THINK_OPEN
+            idx = self._buf.find(tag)
+
+            if idx == -1:
+                # keep a possible partial tag at the end for the next chunk
+                keep = 0
+                for n in range(min(len(tag) - 1, len(self._buf)), 0, -1):
+                    if tag.startswith(self._buf[-n:]):
+                        keep = n
+                        break
+                text = self._buf[: len(self._buf) - keep]
+                self._buf = self._buf[len(self._buf) - keep :]
+                self._emit(text, out)
+                break
+
+            self._emit(self._buf[:idx], out)
+            self._buf = self._buf[idx + len(tag) :]
+            self.in_think = not self.in_think
+
+        return "".join(out)
+
+    def flush(self) -> str:
+        out: list[str] = []
+        self._emit(self._buf, out)
+        self._buf = ""
+        return "".join(out)
+
+    def _emit(self, text: str, out: list[str]) -> None:
+        if not text:
+            return
+        if self.in_think:
+            self.thinking += text
+        else:
+            out.append(text)
+
+
+def ensure_markdown(text: str) -> str:
+    """
+    Best-effort formatter to ensure headings render in Markdown.
+    If the model already produced Markdown headings (##), we leave it unchanged.
+    Otherwise, we upgrade common section titles into Markdown headings with light emojis.
+    """
+
+    if re.search(r"(?m)^##\s+", text):
+        return text
+
+    heading_map: list[tuple[re.Pattern[str], str]] = [
+        (re.compile(r"(?im)^\s*summary\s*:?\s*$"), "## 📝 Summary"),
+        (re.compile(r"(?im)^\s*key\s+concepts\s*:?\s*$"), "## 🎯 Key Concepts"),
+        (re.compile(r"(?im)^\s*key\s+takeaways\s*:?\s*$"), "## 🎯 Key Takeaways"),
+        (re.compile(r"(?im)^\s*examples\s*:?\s*$"), "## 🧪 Examples"),
+        (re.compile(r"(?im)^\s*common\s+pitfalls\s*:?\s*$"), "## ⚠️ Common Pitfalls"),
+        (re.compile(r"(?im)^\s*practice\s+questions\s*:?\s*$"), "## ✅ Practice Questions"),
+        (
+            re.compile(r"(?im)^\s*clarifying\s+questions\s*:?\s*$"),
+            "## ❓ Clarifying Questions",
+        ),
+        (re.compile(r"(?im)^\s*7[- ]day\s+study\s+plan\s*:?\s*$"), "## 🗓️ 7-Day Study Plan"),
+        (re.compile(r"(?im)^\s*flashcards\s*:?\s*$"), "## 🧠 Flashcards"),
+        (re.compile(r"(?im)^\s*quiz\s*:?\s*$"), "## ✅ Quiz"),
+        (re.compile(r"(?im)^\s*revision\s+checklist\s*:?\s*$"), "## 📌 Revision Checklist"),
+    ]
+
+    lines = text.splitlines()
+    out: list[str] = []
+    found_any_heading = False
+
+    for line in lines:
+        replaced = False
+        for pattern, heading in heading_map:
+            if pattern.match(line):
+                # Insert separator between sections (not before the first).
+                if found_any_heading and (len(out) > 0 and out[-1].strip() != "---"):
+                    # Add a clean separator with spacing.
+                    if out[-1].strip() != "":
+                        out.append("")
+                    out.append("---")
+                    out.append("")
+
+                out.append(heading)
+                out.append("")  # blank line after heading
+                found_any_heading = True
+                replaced = True
+                break
+        if replaced:
+            continue
+
+        out.append(line)
+
+    return "\n".join(out).strip() + "\n"
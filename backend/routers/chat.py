@@ -0,0 +1,353 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from pydantic import BaseModel
+
+from db import get_conn
+from events import notify_conversation
+from file_context import FILES_CONTEXT_MAX_CHARS, build_files_context
+from llm import (
+    DISCONNECT_POLL_S,
+    GENERATION_METRICS,
+    get_ollama_client,
+    record_cancelled_generation,
+)
+from prompts import ThinkFilter, build_system_prompt, ensure_markdown, strip_thinking
+from titles import enqueue_title
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class SendMessageBody(BaseModel):
+    content: str
+    model: str = "qwen3:4b"
+    intent: Optional[
+        Literal["summary", "study_plan", "practice_questions", "custom"]
+    ] = None
+    output_mode: Optional[Literal["quick", "full", "study_ready"]] = None
+    # qwen3 reasoning: off by default so <think> blocks never reach the DB/prompt
+    think: bool = False
+
+
+class StoredMessage(BaseModel):
+    id: int
+    role: str
+    content: str
+    created_at: str
+
+
+class SendMessageResponse(BaseModel):
+    user_message: StoredMessage
+    assistant_message: StoredMessage
+    reasoning: Optional[str]
+
+
+# --------- IDEMPOTENCY -----------
+# Per-process LRU of send_message results keyed by (conversation, key).
+# In-flight entries let a retry wait on the original generation instead of
+# starting a second one; completed entries are replayed for IDEMPOTENCY_TTL_S.
+IDEMPOTENCY_MAX_ENTRIES = 2048
+IDEMPOTENCY_TTL_S = 24 * 60 * 60
+
+
+class IdempotencyEntry:
+    def __init__(self, body_fingerprint: str, request: Request):
+        self.body_fingerprint = body_fingerprint
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.requests: list[Request] = [request]
+        # only needed while generating; a replayed entry lives for the TTL
+        self.future.add_done_callback(lambda _: self.requests.clear())
+        self.created_at = asyncio.get_running_loop().time()
+        # user row inserted but not yet answered; removed if generation fails
+        self.user_message_id: Optional[int] = None
+
+    async def abandoned(self) -> bool:
+        # only give up on the generation when every waiting client is gone
+        for r in self.requests:
+            if not await r.is_disconnected():
+                return False
+        return True
+
+
+IDEMPOTENCY_CACHE: "OrderedDict[tuple[str, str], IdempotencyEntry]" = OrderedDict()
+
+
+def idempotency_lookup(key: tuple[str, str]) -> Optional[IdempotencyEntry]:
+    entry = IDEMPOTENCY_CACHE.get(key)
+    if entry is None:
+        return None
+    age = asyncio.get_running_loop().time() - entry.created_at
+    if entry.future.done() and age > IDEMPOTENCY_TTL_S:
+        del IDEMPOTENCY_CACHE[key]
+        return None
+    IDEMPOTENCY_CACHE.move_to_end(key)
+    return entry
+
+
+def idempotency_store(key: tuple[str, str], entry: IdempotencyEntry) -> None:
+    IDEMPOTENCY_CACHE[key] = entry
+    while len(IDEMPOTENCY_CACHE) > IDEMPOTENCY_MAX_ENTRIES:
+        oldest_key, oldest = next(iter(IDEMPOTENCY_CACHE.items()))
+        if not oldest.future.done():
+            break  # never evict a generation someone may still join
+        del IDEMPOTENCY_CACHE[oldest_key]
+
+
+@router.post(
+    "/conversations/{conversation_id}/messages", response_model=SendMessageResponse
+)
+async def send_message(
+    conversation_id: str,
+    body: SendMessageBody,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+):
+    if not idempotency_key:
+        return await generate_reply(conversation_id, body, request.is_disconnected)
+
+    key = (conversation_id, idempotency_key)
+    fingerprint = hashlib.sha256(body.model_dump_json().encode("utf-8")).hexdigest()
+
+    entry = idempotency_lookup(key)
+    if entry is not None:
+        if entry.body_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different body",
+            )
+        if not entry.future.done():
+            entry.requests.append(request)
+        # shield: a retry that disconnects must not cancel the shared result
+        return await asyncio.shield(entry.future)
+
+    entry = IdempotencyEntry(fingerprint, request)
+    idempotency_store(key, entry)
+    try:
+        result = await generate_reply(conversation_id, body, entry.abandoned, entry)
+    except BaseException as e:
+        # failed or cancelled: forget the key so the next retry starts over,
+        # and drop its user row so that retry does not store it twice
+        IDEMPOTENCY_CACHE.pop(key, None)
+        if entry.user_message_id is not None:
+            delete_user_message(entry.user_message_id)
+        if isinstance(e, Exception):
+            entry.future.set_exception(e)
+            entry.future.exception()  # mark retrieved if nobody was waiting
+        else:
+            entry.future.cancel()
+        raise
+    entry.future.set_result(result)
+    return result
+
+
+def delete_user_message(message_id: int) -> None:
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM messages WHERE id = %s AND role = 'user'", (message_id,)
+            )
+            conn.commit()
+    except Exception:
+        logger.warning("could not delete message %s", message_id, exc_info=True)
+
+
+async def watch_disconnect(
+    is_abandoned: Callable[[], Awaitable[bool]], stop: asyncio.Event
+) -> bool:
+    """
+    Polls until the client is gone (True) or `stop` is set (False).
+    Stopped with an event rather than cancel(): Starlette's is_disconnected
+    runs in an anyio cancel scope that can swallow a task cancellation.
+    """
+    while not stop.is_set():
+        if await is_abandoned():
+            return True
+        try:
+            await asyncio.wait_for(stop.wait(), DISCONNECT_POLL_S)
+        except asyncio.TimeoutError:
+            pass
+    return False
+
+
+async def generate_reply(
+    conversation_id: str,
+    body: SendMessageBody,
+    is_abandoned: Callable[[], Awaitable[bool]],
+    entry: Optional[IdempotencyEntry] = None,
+) -> dict:
+    user_text = body.content.strip()
+    if not user_text:
+        raise HTTPException(status_code=400, detail="content is required")
+
+    # 1) Insert user message + load context
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO messages (conversation_id, role, content, created_at)
+            VALUES (%s, 'user', %s, now())
+            RETURNING id, created_at
+            """,
+            (conversation_id, user_text),
+        )
+        user_row = cur.fetchone()
+        if user_row is None:
+            raise HTTPException(status_code=500, detail="Failed to insert user message")
+
+        cur.execute(
+            """
+            SELECT role, content
+            FROM messages
+            WHERE conversation_id = %s
+            ORDER BY id DESC
+            LIMIT 20
+            """,
+            (conversation_id,),
+        )
+        ctx = list(reversed(cur.fetchall()))
+        conn.commit()
+    if entry is not None:
+        entry.user_message_id = user_row[0]
+
+    # 2) Build the prompt (no DB connection held while the model runs)
+    files_text = build_files_context(
+        conversation_id=conversation_id,
+        max_chars=FILES_CONTEXT_MAX_CHARS,
+        query=user_text,
+    )
+
+    intent = body.intent or "custom"
+    output_mode = body.output_mode or "full"
+    system_prompt = build_system_prompt(
+        intent=intent, output_mode=output_mode, files_text=files_text
+    )
+
+    ollama_messages = [
+        {"role": role, "content": strip_thinking(content)} for (role, content) in ctx
+    ]
+    ollama_messages = [{"role": "system", "content": system_prompt}] + ollama_messages
+
+    # Stream so <think> blocks are filtered chunk by chunk instead of
+    # holding the whole raw reply; newer Ollama also returns reasoning
+    # separately in message.thinking when think=True.
+    # A watcher polls for a gone client alongside the stream, so a request
+    # still queued for the Ollama slot or evaluating its prompt is cancelled
+    # before the first chunk too: closing the HTTP stream makes Ollama drop it.
+    think_filter = ThinkFilter()
+    answer_parts: list[str] = []
+    thinking_parts: list[str] = []
+    tokens = 0
+    eval_count: Optional[int] = None
+
+    async def consume() -> None:
+        nonlocal tokens, eval_count
+        stream = await get_ollama_client().chat(
+            model=body.model,
+            messages=ollama_messages,
+            think=body.think,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                tokens += 1
+                if chunk.message.thinking:
+                    thinking_parts.append(chunk.message.thinking)
+                answer_parts.append(think_filter.feed(chunk.message.content or ""))
+                if chunk.done:
+                    eval_count = chunk.eval_count
+        finally:
+            await stream.aclose()
+
+    stop_watching = asyncio.Event()
+    GENERATION_METRICS["in_flight"] += 1
+    consumer = asyncio.create_task(consume())
+    watcher = asyncio.create_task(watch_disconnect(is_abandoned, stop_watching))
+    try:
+        done, _ = await asyncio.wait(
+            {consumer, watcher}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        # also runs when send_message itself is cancelled
+        stop_watching.set()
+        consumer.cancel()
+        await asyncio.gather(consumer, watcher, return_exceptions=True)
+        GENERATION_METRICS["in_flight"] -= 1
+    if consumer not in done and watcher.result():
+        record_cancelled_generation(tokens)
+        # nothing is stored for the assistant; the user row stays
+        # unless an Idempotency-Key retry would repeat it
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    consumer.result()  # re-raise a model error
+    answer_parts.append(think_filter.flush())
+
+    GENERATION_METRICS["completed"] += 1
+    GENERATION_METRICS["completed_tokens"] += eval_count or tokens
+
+    assistant_text = ensure_markdown("".join(answer_parts).strip())
+    reasoning = ("".join(thinking_parts) + think_filter.thinking).strip()
+
+    # 3) Insert assistant + bump updated_at
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO messages (conversation_id, role, content, created_at)
+            VALUES (%s, 'assistant', %s, now())
+            RETURNING id, created_at
+            """,
+            (conversation_id, assistant_text),
+        )
+        asst_row = cur.fetchone()
+        if asst_row is None:
+            raise HTTPException(
+                status_code=500, detail="Failed to insert assistant message"
+            )
+
+        cur.execute(
+            "UPDATE conversations SET updated_at = now() WHERE id = %s",
+            (conversation_id,),
+        )
+        # ids only: other devices fetch the bodies with after_id
+        notify_conversation(
+            cur,
+            conversation_id,
+            "message.appended",
+            {
+                "conversation_id": conversation_id,
+                "message_ids": [user_row[0], asst_row[0]],
+                "updated_at": asst_row[1].isoformat(),
+            },
+        )
+        conn.commit()
+    if entry is not None:
+        entry.user_message_id = None  # answered: keep it
+
+    # first exchange: name the conversation off the request path
+    if len(ctx) == 1:
+        enqueue_title(conversation_id, user_text, assistant_text)
+
+    return {
+        "user_message": {
+            "id": user_row[0],
+            "role": "user",
+            "content": user_text,
+            "created_at": user_row[1].isoformat(),
+        },
+        "assistant_message": {
+            "id": asst_row[0],
+            "role": "assistant",
+            "content": assistant_text,
+            "created_at": asst_row[1].isoformat(),
+        },
+        # reasoning is never persisted; only echoed back when asked for
+        "reasoning": reasoning if body.think and reasoning else None,
+    }
+
+
+@router.get("/metrics/generation", response_model=dict[str, dict[str, int]])
+async def generation_metrics():
+    return {"generation": GENERATION_METRICS}
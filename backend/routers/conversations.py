@@ -0,0 +1,445 @@
+import logging
+import uuid
+from pathlib import Path
+from typing import Literal, Optional, Union
+
+import psycopg
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from db import get_conn
+from events import notify_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class CreateConversationBody(BaseModel):
+    user_id: str
+    title: Optional[str] = None
+
+
+class EditConversationBody(BaseModel):
+    title: str
+
+
+# Response models: FastAPI serializes through pydantic-core with these set.
+# Timestamps stay isoformat() strings so the wire format does not change.
+class Conversation(BaseModel):
+    id: str
+    title: Optional[str]
+    created_at: str
+    updated_at: str
+
+
+class ConversationResponse(BaseModel):
+    conversation: Conversation
+
+
+class ConversationList(BaseModel):
+    conversations: list[Conversation]
+
+
+class Message(BaseModel):
+    id: int
+    role: str
+    content: str
+    created_at: str
+
+
+class MessagePage(BaseModel):
+    messages: list[Message]
+    has_more: Optional[bool] = None  # only set for after_id (delta) reads
+
+
+class SearchHit(BaseModel):
+    conversation_id: str
+    conversation_title: Optional[str]
+    created_at: str
+    rank: float
+    snippet: str
+
+
+class MessageSearchHit(SearchHit):
+    message_id: int
+    role: str
+
+
+class FileSearchHit(SearchHit):
+    file_id: int
+    filename: str
+
+
+class SearchCursor(BaseModel):
+    before_rank: float
+    before_id: int
+
+
+class SearchWindow(BaseModel):
+    older_than_id: int
+
+
+class SearchResults(BaseModel):
+    results: Union[list[MessageSearchHit], list[FileSearchHit]]
+    next: Optional[SearchCursor]
+    # more matches exist beyond the ranked window; `older` reaches them
+    truncated: bool
+    older: Optional[SearchWindow]
+
+
+@router.get("/conversations", response_model=ConversationList)
+async def list_conversation(user_id: str):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, title, created_at, updated_at
+            FROM conversations
+            WHERE user_id = %s
+            ORDER BY updated_at DESC
+            """,
+            (user_id,),
+        )
+        rows = cur.fetchall()
+
+    return {
+        "conversations": [
+            {
+                "id": str(r[0]),
+                "title": r[1],
+                "created_at": r[2].isoformat(),
+                "updated_at": r[3].isoformat(),
+            }
+            for r in rows
+        ]
+    }
+
+
+@router.post("/conversations", response_model=ConversationResponse)
+async def create_conversation(body: CreateConversationBody):
+    convo_id = str(uuid.uuid4())
+
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO conversations (id, user_id, title, created_at, updated_at)
+                VALUES (%s, %s, %s, now(), now())
+                RETURNING id, title, created_at, updated_at
+                """,
+                (convo_id, body.user_id, body.title),
+            )
+            row = cur.fetchone()
+            if row is not None:
+                notify_user(
+                    cur,
+                    body.user_id,
+                    "conversation.created",
+                    {
+                        "id": str(row[0]),
+                        "title": row[1],
+                        "updated_at": row[3].isoformat(),
+                    },
+                )
+            conn.commit()
+    except psycopg.errors.ForeignKeyViolation:
+        raise HTTPException(
+            status_code=400, detail="user_id does not exist in users table"
+        )
+
+    if row is None:
+        raise HTTPException(status_code=500, detail="Failed to create conversation")
+
+    return {
+        "conversation": {
+            "id": str(row[0]),
+            "title": row[1],
+            "created_at": row[2].isoformat(),
+            "updated_at": row[3].isoformat(),
+        }
+    }
+
+
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=MessagePage,
+    response_model_exclude_unset=True,
+)
+async def fetch_messages(
+    conversation_id: str,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+):
+    if before_id is not None and after_id is not None:
+        raise HTTPException(
+            status_code=400, detail="use either before_id or after_id, not both"
+        )
+
+    with get_conn() as conn, conn.cursor() as cur:
+        if after_id is not None:
+            # delta sync: only rows the client has not seen yet, oldest first
+            cur.execute(
+                """
+                SELECT id, role, content, created_at
+                FROM messages
+                WHERE conversation_id = %s AND id > %s
+                ORDER BY id ASC
+                LIMIT %s
+                """,
+                (conversation_id, after_id, limit + 1),
+            )
+            rows = cur.fetchall()
+            has_more = len(rows) > limit
+            return {
+                "messages": [
+                    {
+                        "id": r[0],
+                        "role": r[1],
+                        "content": r[2],
+                        "created_at": r[3].isoformat(),
+                    }
+                    for r in rows[:limit]
+                ],
+                "has_more": has_more,
+            }
+
+        if before_id is None:
+            cur.execute(
+                """
+                SELECT id, role, content, created_at
+                FROM messages
+                WHERE conversation_id = %s
+                ORDER BY id DESC
+                LIMIT %s
+                """,
+                (conversation_id, limit),
+            )
+        else:
+            cur.execute(
+                """
+                SELECT id, role, content, created_at
+                FROM messages
+                WHERE conversation_id = %s AND id < %s
+                ORDER BY id DESC
+                LIMIT %s
+                """,
+                (conversation_id, before_id, limit),
+            )
+        rows = cur.fetchall()
+
+    rows = list(reversed(rows))  # ascending for UI
+    return {
+        "messages": [
+            {"id": r[0], "role": r[1], "content": r[2], "created_at": r[3].isoformat()}
+            for r in rows
+        ]
+    }
+
+
+# scope -> (id column, label column, text column, tsvector column, table)
+SEARCH_SOURCES = {
+    "messages": ("t.id", "t.role", "t.content", "t.content_tsv", "messages"),
+    "files": (
+        "t.id",
+        "t.filename",
+        "t.extracted_text",
+        "t.extracted_tsv",
+        "conversation_files",
+    ),
+}
+# Ranking needs every candidate's tsvector, so its cost grows with the number
+# of matches, not with the page size. Only a window of the most recent matches
+# is ranked; older_than_id moves the window back in time.
+SEARCH_MAX_CANDIDATES = 1000
+
+
+@router.get("/search", response_model=SearchResults)
+async def search(
+    user_id: str,
+    q: str,
+    scope: Literal["messages", "files"] = "messages",
+    limit: int = 20,
+    before_rank: Optional[float] = None,
+    before_id: Optional[int] = None,
+    older_than_id: Optional[int] = None,
+):
+    """
+    Ranked full-text search over the newest SEARCH_MAX_CANDIDATES matches
+    with id < older_than_id (all matches when unset). `next` pages through
+    that window by rank. `truncated` says older matches were left out, and
+    `older` is the older_than_id to search them with.
+    """
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="q is required")
+    if (before_rank is None) != (before_id is None):
+        raise HTTPException(
+            status_code=400, detail="before_rank and before_id go together"
+        )
+    limit = max(1, min(limit, 100))
+    id_col, label_col, text_col, tsv_col, table = SEARCH_SOURCES[scope]
+
+    # GIN index on the tsvector column does the matching; only ids are read to
+    # pick the window. Rank is computed for the window on every page (the
+    # keyset cursor saves sending rows, not ranking them); headlines only for
+    # the page.
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT {id_col}
+            FROM {table} t
+            JOIN conversations c ON c.id = t.conversation_id
+            WHERE c.user_id = %s
+              AND {tsv_col} @@ websearch_to_tsquery('simple', %s)
+              AND (%s::bigint IS NULL OR {id_col} < %s)
+            ORDER BY {id_col} DESC
+            LIMIT %s
+            """,
+            (user_id, query, older_than_id, older_than_id, SEARCH_MAX_CANDIDATES + 1),
+        )
+        window = [r[0] for r in cur.fetchall()]
+        truncated = len(window) > SEARCH_MAX_CANDIDATES
+        window = window[:SEARCH_MAX_CANDIDATES]
+
+        cur.execute(
+            f"""
+            WITH q AS (SELECT websearch_to_tsquery('simple', %s) AS tsq),
+            hits AS (
+                SELECT {id_col} AS id, t.conversation_id, c.title,
+                       {label_col} AS label, {text_col} AS body, t.created_at,
+                       ts_rank_cd({tsv_col}, q.tsq) AS rank
+                FROM {table} t
+                JOIN conversations c ON c.id = t.conversation_id
+                CROSS JOIN q
+                WHERE {id_col} = ANY(%s)
+            ),
+            page AS (
+                SELECT *
+                FROM hits
+                WHERE %s::real IS NULL OR (rank, id) < (%s::real, %s)
+                ORDER BY rank DESC, id DESC
+                LIMIT %s
+            )
+            SELECT page.id, page.conversation_id, page.title, page.label,
+                   page.created_at, page.rank,
+                   ts_headline('simple', page.body, q.tsq,
+                               'MaxFragments=2, MinWords=5, MaxWords=20')
+            FROM page CROSS JOIN q
+            ORDER BY page.rank DESC, page.id DESC
+            """,
+            (query, window, before_rank, before_rank, before_id, limit),
+        )
+        rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = {"before_rank": rows[-1][5], "before_id": rows[-1][0]}
+
+    id_key, label_key = (
+        ("message_id", "role") if scope == "messages" else ("file_id", "filename")
+    )
+    return {
+        "results": [
+            {
+                id_key: r[0],
+                "conversation_id": str(r[1]),
+                "conversation_title": r[2],
+                label_key: r[3],
+                "created_at": r[4].isoformat(),
+                "rank": r[5],
+                "snippet": r[6],
+            }
+            for r in rows
+        ],
+        "next": next_cursor,
+        "truncated": truncated,
+        "older": {"older_than_id": window[-1]} if truncated else None,
+    }
+
+
+@router.patch("/conversations/{conversation_id}", response_model=ConversationResponse)
+async def edit_conversation(conversation_id: str, body: EditConversationBody):
+    title = body.title.strip()
+    if not title:
+        raise HTTPException(status_code=400, detail="title is required")
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE conversations
+            SET title = %s,
+                updated_at = now()
+            WHERE id = %s
+            RETURNING id, title, created_at, updated_at, user_id
+            """,
+            (title, conversation_id),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            notify_user(
+                cur,
+                row[4],
+                "conversation.renamed",
+                {"id": str(row[0]), "title": row[1], "updated_at": row[3].isoformat()},
+            )
+        conn.commit()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    return {
+        "conversation": {
+            "id": str(row[0]),
+            "title": row[1],
+            "created_at": row[2].isoformat(),
+            "updated_at": row[3].isoformat(),
+        }
+    }
+
+
+@router.delete("/conversations/{conversation_id}", response_model=ConversationResponse)
+async def delete_conversation(conversation_id: str):
+
+    if not conversation_id:
+        raise HTTPException(status_code=400, detail="No conversation found")
+
+    with get_conn() as conn, conn.cursor() as cur:
+        # file rows go with the cascade; grab their paths to clean the disk
+        cur.execute(
+            "SELECT storage_path FROM conversation_files WHERE conversation_id = %s",
+            (conversation_id,),
+        )
+        storage_paths = [r[0] for r in cur.fetchall()]
+
+        cur.execute(
+            """
+            DELETE FROM conversations
+            WHERE id = %s
+            RETURNING id, title, created_at, updated_at, user_id
+            """,
+            (conversation_id,),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            notify_user(cur, row[4], "conversation.deleted", {"id": str(row[0])})
+        conn.commit()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    # best effort: anything left behind is picked up by upload_gc
+    for storage_path in storage_paths:
+        try:
+            Path(storage_path).unlink(missing_ok=True)
+        except OSError:
+            logger.warning("could not delete upload %s", storage_path, exc_info=True)
+
+    return {
+        "conversation": {
+            "id": str(row[0]),
+            "title": row[1],
+            "created_at": row[2].isoformat(),
+            "updated_at": row[3].isoformat(),
+        }
+    }
@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from events import subscribe, unsubscribe
+
+router = APIRouter()
+
+
+@router.websocket("/users/{user_id}/events")
+async def user_events(websocket: WebSocket, user_id: str):
+    """
+    Pushes {type, data} JSON events for one user: conversation.created,
+    conversation.renamed, conversation.deleted, message.appended,
+    file.ingested, file.deleted, and resync when events may have been lost.
+    """
+    await websocket.accept()
+    queue = subscribe(user_id)
+
+    # a receive task notices the client going away even when no events flow
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                await websocket.send_json(getter.result())
+            else:
+                getter.cancel()
+
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                # clients have nothing to say; ignore pings/text and keep going
+                receiver = asyncio.create_task(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        unsubscribe(user_id, queue)
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from pydantic import BaseModel
+
+from db import get_conn
+from events import notify_conversation
+from extraction import extract_text_for_file
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", "./uploads"))
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class ConversationFile(BaseModel):
+    id: int
+    filename: str
+    mime_type: Optional[str]
+    size_bytes: Optional[int]
+    created_at: str
+
+
+class UploadedFile(ConversationFile):
+    conversation_id: str
+    page_count: Optional[int]
+
+
+class UploadResponse(BaseModel):
+    file: UploadedFile
+
+
+class FileList(BaseModel):
+    files: list[ConversationFile]
+
+
+class DeleteFileResponse(BaseModel):
+    deleted: bool
+    file_id: int
+
+
+@router.post("/conversations/{conversation_id}/files", response_model=UploadResponse)
+async def upload_conversation_file(
+    conversation_id: str,
+    file: UploadFile = File(...),
+):
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="filename is required")
+
+    mime = file.content_type or "application/octet-stream"
+
+    # guarda no disco
+    safe_ext = Path(file.filename).suffix.lower()
+    stored_name = f"{uuid.uuid4().hex}{safe_ext}"
+    dst = UPLOAD_DIR / stored_name
+
+    size = 0
+    sha256 = hashlib.sha256()
+    with dst.open("wb") as f:
+        while True:
+            chunk = await file.read(1024 * 1024)
+            if not chunk:
+                break
+            size += len(chunk)
+            sha256.update(chunk)
+            f.write(chunk)
+
+    # extrai o texto uma vez; build_files_context lê daqui
+    extracted = True
+    try:
+        text, page_count = await asyncio.to_thread(
+            extract_text_for_file, mime, str(dst)
+        )
+    except Exception:
+        # leave text_extracted_at NULL so build_files_context retries
+        logger.warning("text extraction failed for %s", dst, exc_info=True)
+        text, page_count = "", None
+        extracted = False
+
+    # regista na DB
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO conversation_files (
+                conversation_id, filename, mime_type, size_bytes, storage_path,
+                content_sha256, page_count, extracted_text, text_extracted_at
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CASE WHEN %s THEN now() END)
+            RETURNING id, created_at
+            """,
+            (
+                conversation_id,
+                file.filename,
+                mime,
+                size,
+                str(dst),
+                sha256.hexdigest(),
+                page_count,
+                text,
+                extracted,
+            ),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            notify_conversation(
+                cur,
+                conversation_id,
+                "file.ingested",
+                {
+                    "conversation_id": conversation_id,
+                    "file_id": row[0],
+                    "filename": file.filename,
+                    "page_count": page_count,
+                },
+            )
+        conn.commit()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    # section + file summaries are left to summary_worker on the generation
+    # workers, which only runs them when the files overflow the context budget
+
+    return {
+        "file": {
+            "id": row[0],
+            "conversation_id": conversation_id,
+            "filename": file.filename,
+            "mime_type": mime,
+            "size_bytes": size,
+            "page_count": page_count,
+            "created_at": row[1].isoformat(),
+        }
+    }
+
+
+@router.get("/conversations/{conversation_id}/files", response_model=FileList)
+async def list_conversation_files(conversation_id: str):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT id, filename, mime_type, size_bytes, created_at
+            FROM conversation_files
+            WHERE conversation_id = %s
+            ORDER BY id DESC
+            """,
+            (conversation_id,),
+        )
+        rows = cur.fetchall()
+
+    return {
+        "files": [
+            {
+                "id": r[0],
+                "filename": r[1],
+                "mime_type": r[2],
+                "size_bytes": r[3],
+                "created_at": r[4].isoformat(),
+            }
+            for r in rows
+        ]
+    }
+
+
+@router.delete(
+    "/conversations/{conversation_id}/files/{file_id}",
+    response_model=DeleteFileResponse,
+)
+async def delete_conversation_file(conversation_id: str, file_id: int):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT storage_path
+            FROM conversation_files
+            WHERE id = %s AND conversation_id = %s
+            """,
+            (file_id, conversation_id),
+        )
+        row = cur.fetchone()
+
+        if row is None:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        storage_path = row[0]
+
+        cur.execute(
+            "DELETE FROM conversation_files WHERE id = %s AND conversation_id = %s",
+            (file_id, conversation_id),
+        )
+        notify_conversation(
+            cur,
+            conversation_id,
+            "file.deleted",
+            {"conversation_id": conversation_id, "file_id": file_id},
+        )
+        conn.commit()
+
+    # delete from disk (best effort; upload_gc retries orphans later)
+    try:
+        Path(storage_path).unlink(missing_ok=True)
+    except OSError:
+        logger.warning("could not delete upload %s", storage_path, exc_info=True)
+
+    return {"deleted": True, "file_id": file_id}
@@ -0,0 +1,336 @@
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import orjson
+import psycopg
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from db import get_conn
+from events import notify_user
+from routers.files import UPLOAD_DIR
+
+router = APIRouter()
+
+EXPORT_BATCH_ROWS = 2000
+
+
+def _ndjson(record: dict) -> bytes:
+    return orjson.dumps(record) + b"\n"
+
+
+def iter_user_export(user_id: str):
+    """
+    Yields one NDJSON line per row: the user, then conversations, messages and
+    file metadata (grouped by type so import can COPY each group in one go).
+    Rows come from server-side cursors, so memory stays flat for big accounts.
+    """
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, email, created_at FROM users WHERE id = %s", (user_id,)
+            )
+            user_row = cur.fetchone()
+        if user_row is None:
+            return
+
+        yield _ndjson(
+            {
+                "type": "user",
+                "id": str(user_row[0]),
+                "email": user_row[1],
+                "created_at": user_row[2].isoformat(),
+            }
+        )
+
+        with conn.cursor(name="export_conversations") as cur:
+            cur.itersize = EXPORT_BATCH_ROWS
+            cur.execute(
+                """
+                SELECT id, title, created_at, updated_at
+                FROM conversations
+                WHERE user_id = %s
+                ORDER BY created_at ASC
+                """,
+                (user_id,),
+            )
+            for r in cur:
+                yield _ndjson(
+                    {
+                        "type": "conversation",
+                        "id": str(r[0]),
+                        "title": r[1],
+                        "created_at": r[2].isoformat(),
+                        "updated_at": r[3].isoformat(),
+                    }
+                )
+
+        with conn.cursor(name="export_messages") as cur:
+            cur.itersize = EXPORT_BATCH_ROWS
+            cur.execute(
+                """
+                SELECT m.id, m.conversation_id, m.role, m.content, m.created_at
+                FROM messages m
+                JOIN conversations c ON c.id = m.conversation_id
+                WHERE c.user_id = %s
+                ORDER BY m.conversation_id, m.id
+                """,
+                (user_id,),
+            )
+            for r in cur:
+                yield _ndjson(
+                    {
+                        "type": "message",
+                        "id": r[0],
+                        "conversation_id": str(r[1]),
+                        "role": r[2],
+                        "content": r[3],
+                        "created_at": r[4].isoformat(),
+                    }
+                )
+
+        with conn.cursor(name="export_files") as cur:
+            cur.itersize = EXPORT_BATCH_ROWS
+            cur.execute(
+                """
+                SELECT f.id, f.conversation_id, f.filename, f.mime_type,
+                       f.size_bytes, f.storage_path, f.created_at,
+                       f.content_sha256, f.page_count, f.extracted_text
+                FROM conversation_files f
+                JOIN conversations c ON c.id = f.conversation_id
+                WHERE c.user_id = %s
+                ORDER BY f.conversation_id, f.id
+                """,
+                (user_id,),
+            )
+            for r in cur:
+                yield _ndjson(
+                    {
+                        "type": "file",
+                        "id": r[0],
+                        "conversation_id": str(r[1]),
+                        "filename": r[2],
+                        "mime_type": r[3],
+                        "size_bytes": r[4],
+                        "storage_path": r[5],
+                        "created_at": r[6].isoformat(),
+                        "content_sha256": r[7],
+                        "page_count": r[8],
+                        "extracted_text": r[9],
+                    }
+                )
+
+
+@router.get("/users/{user_id}/export")
+async def export_user(user_id: str):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM users WHERE id = %s", (user_id,))
+        if cur.fetchone() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+    return StreamingResponse(
+        iter_user_export(user_id),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="jorge-{user_id}.ndjson"'
+        },
+    )
+
+
+IMPORT_COPY_SQL = {
+    "conversation": (
+        "COPY conversations (id, user_id, title, created_at, updated_at) FROM STDIN"
+    ),
+    "message": (
+        "COPY messages (conversation_id, role, content, created_at) FROM STDIN"
+    ),
+    "file": (
+        "COPY conversation_files "
+        "(conversation_id, filename, mime_type, size_bytes, storage_path, created_at, "
+        "content_sha256, page_count, extracted_text, text_extracted_at) "
+        "FROM STDIN"
+    ),
+}
+
+
+def _import_file_copy(storage_path: str, own_paths: set[Path]) -> tuple[str, bool]:
+    """
+    Picks a fresh storage path for an imported file row and copies the bytes
+    there when the exported path is one of the importer's own uploads on
+    this host. Returns (new_path, copied); when nothing was copied the path
+    points nowhere.
+    """
+    dst = UPLOAD_DIR / f"{uuid.uuid4().hex}{Path(storage_path).suffix.lower()}"
+    # the NDJSON is user input: never copy anything from outside UPLOAD_DIR
+    # (resolve() also follows symlinks that point out of it) or another
+    # user's upload
+    src = Path(storage_path).resolve()
+    if not src.is_relative_to(UPLOAD_DIR.resolve()) or src not in own_paths:
+        return str(dst), False
+    try:
+        shutil.copyfile(src, dst)
+    except OSError:
+        return str(dst), False
+    return str(dst), True
+
+
+class ImportCounts(BaseModel):
+    conversations: int
+    messages: int
+    files: int
+
+
+class ImportResponse(BaseModel):
+    imported: ImportCounts
+
+
+@router.post("/users/{user_id}/import", response_model=ImportResponse)
+async def import_user(user_id: str, request: Request):
+    """
+    Imports an NDJSON export into `user_id`.
+    Conversations get fresh ids (so importing twice never collides) and
+    messages/files are remapped onto them. File bytes are copied to new names
+    under UPLOAD_DIR when the exported path exists here; otherwise the row
+    keeps only its exported text. Consecutive lines of the same type
+    go through a single COPY; the whole import is one transaction.
+    """
+    convo_ids: dict[str, str] = {}
+    copied_paths: list[str] = []
+    imported_at = datetime.now(timezone.utc)
+    counts = {"conversation": 0, "message": 0, "file": 0}
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM users WHERE id = %s", (user_id,))
+        if cur.fetchone() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        # read before any COPY starts: the connection is busy until it ends
+        cur.execute(
+            """
+            SELECT f.storage_path
+            FROM conversation_files f
+            JOIN conversations c ON c.id = f.conversation_id
+            WHERE c.user_id = %s
+            """,
+            (user_id,),
+        )
+        own_paths = {Path(r[0]).resolve() for r in cur.fetchall()}
+
+        copy_cm = None
+        copy = None
+        copy_type = None
+
+        def write(kind: str, row: tuple) -> None:
+            nonlocal copy_cm, copy, copy_type
+            if kind != copy_type:
+                if copy_cm is not None:
+                    copy_cm.__exit__(None, None, None)
+                copy_cm = cur.copy(IMPORT_COPY_SQL[kind])
+                copy = copy_cm.__enter__()
+                copy_type = kind
+            copy.write_row(row)
+            counts[kind] += 1
+
+        def handle(line: bytes) -> None:
+            if not line.strip():
+                return
+            try:
+                rec = orjson.loads(line)
+                kind = rec["type"]
+                if kind == "user":
+                    return
+                if kind == "conversation":
+                    new_id = str(uuid.uuid4())
+                    convo_ids[rec["id"]] = new_id
+                    write(
+                        kind,
+                        (
+                            new_id,
+                            user_id,
+                            rec.get("title"),
+                            rec["created_at"],
+                            rec.get("updated_at") or rec["created_at"],
+                        ),
+                    )
+                elif kind == "message":
+                    write(
+                        kind,
+                        (
+                            convo_ids[rec["conversation_id"]],
+                            rec["role"],
+                            rec["content"],
+                            rec["created_at"],
+                        ),
+                    )
+                elif kind == "file":
+                    storage_path, copied = _import_file_copy(
+                        rec["storage_path"], own_paths
+                    )
+                    if copied:
+                        copied_paths.append(storage_path)
+                    text = rec.get("extracted_text")
+                    # keep the exported text; only a copied file without text
+                    # is left for build_files_context to extract
+                    extracted_at = (
+                        None if copied and text is None else imported_at
+                    )
+                    write(
+                        kind,
+                        (
+                            convo_ids[rec["conversation_id"]],
+                            rec["filename"],
+                            rec.get("mime_type"),
+                            rec.get("size_bytes"),
+                            storage_path,
+                            rec["created_at"],
+                            rec.get("content_sha256"),
+                            rec.get("page_count"),
+                            text,
+                            extracted_at,
+                        ),
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=400, detail=f"Unknown record type: {kind}"
+                    )
+            except (ValueError, KeyError) as e:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid import line: {e}"
+                )
+
+        try:
+            buf = b""
+            async for chunk in request.stream():
+                buf += chunk
+                *lines, buf = buf.split(b"\n")
+                for line in lines:
+                    handle(line)
+            handle(buf)
+
+            if copy_cm is not None:
+                copy_cm.__exit__(None, None, None)
+                copy_cm = None
+        except BaseException as e:
+            if copy_cm is not None:
+                copy_cm.__exit__(type(e), e, e.__traceback__)
+            conn.rollback()
+            for path in copied_paths:
+                Path(path).unlink(missing_ok=True)
+            if isinstance(e, (psycopg.DataError, psycopg.IntegrityError)):
+                raise HTTPException(status_code=400, detail=str(e))
+            raise
+
+        # many rows changed at once: connected clients just reload
+        notify_user(cur, user_id, "resync", {})
+        conn.commit()
+
+    return {
+        "imported": {
+            "conversations": counts["conversation"],
+            "messages": counts["message"],
+            "files": counts["file"],
+        }
+    }
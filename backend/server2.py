@@ -1,20 +1,30 @@
+import asyncio
 import os
+import threading
+import time
 import uuid
 from typing import Optional
-from httpcore import request
 import psycopg
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+
+# torch/transformers are imported inside the functions that need them so
+# that importing this module (tests, tooling, CRUD routes) stays fast.
 
 MODEL_ID = "Qwen/Qwen2.5-3B-Instruct"
+# Optional small same-family model for assisted (speculative) generation: it
+# drafts tokens that the 3B model verifies in one forward pass.
+# e.g. DRAFT_MODEL_ID=Qwen/Qwen2.5-0.5B-Instruct; empty = disabled.
+DRAFT_MODEL_ID = os.environ.get("DRAFT_MODEL_ID", "")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
     os.environ.setdefault(
         "PYTORCH_ENABLE_MPS_FALLBACK", "1"
     )  # optional safety [web:648]
@@ -28,8 +38,16 @@ async def lifespan(app: FastAPI):
     model.to(device)  # type: ignore
     model.eval()
 
+    draft_model = None
+    if DRAFT_MODEL_ID:
+        # must share the tokenizer/vocab with MODEL_ID
+        draft_model = AutoModelForCausalLM.from_pretrained(DRAFT_MODEL_ID)
+        draft_model.to(device)  # type: ignore
+        draft_model.eval()
+
     app.state.tokenizer = tokenizer
     app.state.model = model
+    app.state.draft_model = draft_model
     app.state.device = device
 
     yield
@@ -58,9 +76,73 @@ class CreateConversationBody(BaseModel):
     title: Optional[str] = None
 
 
+# how often send_message checks whether the client is still there
+DISCONNECT_POLL_S = 0.5
+
+GENERATION_METRICS = {
+    "completed": 0,
+    "completed_tokens": 0,
+    "cancelled": 0,
+    "cancelled_tokens_generated": 0,
+    "generation_seconds": 0.0,
+    "assisted": 0,
+    "draft_tokens_proposed": 0,
+    "draft_tokens_accepted": 0,
+}
+
+
+class ForwardCounter:
+    """Counts forward() calls of a model while in the `with` block."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+        self._handle = None
+
+    def _hook(self, module, args, output):
+        self.calls += 1
+
+    def __enter__(self):
+        if self.model is not None:
+            self._handle = self.model.register_forward_hook(self._hook)
+        return self
+
+    def __exit__(self, *exc):
+        if self._handle is not None:
+            self._handle.remove()
+
+
+class CancelOnEvent:
+    """
+    Stops model.generate() at the next token once `event` is set.
+    Duck-types transformers.StoppingCriteria so the module has no
+    import-time dependency on transformers.
+    """
+
+    def __init__(self, event: threading.Event, prompt_len: int):
+        self.event = event
+        self.prompt_len = prompt_len
+        self.generated = 0
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        self.generated = input_ids.shape[-1] - self.prompt_len
+        return self.event.is_set()
+
+
+async def watch_disconnect(request: Request, event: threading.Event):
+    while not event.is_set():
+        if await request.is_disconnected():
+            event.set()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_S)
+
+
 class SendMessageBody(BaseModel):
     content: str
     model: str = "llama3.2:3B"
+    # use the draft model for assisted generation (same output under greedy
+    # decoding, faster on CPU when most drafted tokens are accepted)
+    assisted: bool = True
 
 
 class EditConversationBody(BaseModel):
@@ -167,7 +249,9 @@ async def fetch_messages(
 
 
 @app.post("/conversations/{conversation_id}/messages")
-async def send_message(conversation_id: str, body: SendMessageBody):
+async def send_message(
+    conversation_id: str, body: SendMessageBody, request: Request
+):
     user_text = body.content.strip()
     if not user_text:
         raise HTTPException(status_code=400, detail="content is required")
@@ -201,6 +285,7 @@ async def send_message(conversation_id: str, body: SendMessageBody):
 
     tokenizer = request.app.state.tokenizer
     model = request.app.state.model
+    draft_model = request.app.state.draft_model if body.assisted else None
 
     messages = [{"role": role, "content": content} for (role, content) in ctx]
 
@@ -212,13 +297,69 @@ async def send_message(conversation_id: str, body: SendMessageBody):
         return_tensors="pt",
     ).to(model.device)
 
-    with torch.inference_mode():
-        outputs = model.generate(**inputs, max_new_tokens=40)
+    # generate() runs in a worker thread so the event loop can keep polling
+    # the connection; the stopping criterion ends it when the client leaves.
+    cancelled = threading.Event()
+    stopper = CancelOnEvent(cancelled, prompt_len=inputs.shape[-1])
+
+    # Forward-pass counts give the acceptance rate: every target pass emits
+    # one token of its own plus the draft tokens it accepted, and every draft
+    # pass proposes one token. Approximate if requests overlap.
+    target_passes = ForwardCounter(model)
+    draft_passes = ForwardCounter(draft_model)
+
+    def _generate():
+        import torch
+        from transformers import StoppingCriteriaList
+
+        kwargs = {}
+        if draft_model is not None:
+            kwargs["assistant_model"] = draft_model
+        with torch.inference_mode(), target_passes, draft_passes:
+            return model.generate(
+                inputs,
+                max_new_tokens=40,
+                stopping_criteria=StoppingCriteriaList([stopper]),
+                **kwargs,
+            )
+
+    watcher = asyncio.create_task(watch_disconnect(request, cancelled))
+    started = time.perf_counter()
+    try:
+        outputs = await asyncio.to_thread(_generate)
+    finally:
+        client_gone = cancelled.is_set()
+        cancelled.set()  # also stops the watcher
+        await watcher
+
+    if client_gone:
+        GENERATION_METRICS["cancelled"] += 1
+        GENERATION_METRICS["cancelled_tokens_generated"] += stopper.generated
+        raise HTTPException(status_code=499, detail="Client disconnected")
 
     new_tokens = outputs[0][inputs.shape[-1] :]
     assistant_text = tokenizer.decode(
         new_tokens, skip_special_tokens=True
     ).strip()  # Decode Text to [web:260]
+    elapsed = time.perf_counter() - started
+
+    generation = {
+        "tokens": len(new_tokens),
+        "seconds": round(elapsed, 3),
+        "tokens_per_s": round(len(new_tokens) / elapsed, 2) if elapsed else None,
+        "assisted": draft_model is not None,
+        "acceptance_rate": None,
+    }
+    GENERATION_METRICS["completed"] += 1
+    GENERATION_METRICS["completed_tokens"] += len(new_tokens)
+    GENERATION_METRICS["generation_seconds"] += elapsed
+    if draft_model is not None and draft_passes.calls:
+        accepted = max(len(new_tokens) - target_passes.calls, 0)
+        generation["acceptance_rate"] = round(accepted / draft_passes.calls, 3)
+        GENERATION_METRICS["assisted"] += 1
+        GENERATION_METRICS["draft_tokens_proposed"] += draft_passes.calls
+        GENERATION_METRICS["draft_tokens_accepted"] += accepted
+
     # 3) Insert assistant + bump updated_at
     with get_conn() as conn, conn.cursor() as cur:
         cur.execute(
@@ -254,6 +395,27 @@ async def send_message(conversation_id: str, body: SendMessageBody):
             "content": assistant_text,
             "created_at": asst_row[1].isoformat(),
         },
+        "generation": generation,
+    }
+
+
+@app.get("/metrics/generation")
+async def generation_metrics():
+    m = GENERATION_METRICS
+    return {
+        "generation": {
+            **m,
+            "tokens_per_s": (
+                m["completed_tokens"] / m["generation_seconds"]
+                if m["generation_seconds"]
+                else None
+            ),
+            "acceptance_rate": (
+                m["draft_tokens_accepted"] / m["draft_tokens_proposed"]
+                if m["draft_tokens_proposed"]
+                else None
+            ),
+        }
     }
 
 
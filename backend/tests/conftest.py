@@ -0,0 +1,109 @@
+"""
+API tests against a real Postgres.
+
+Set TEST_DATABASE_URL to a scratch database (it gets migrated and written
+to); without it, or without the backend dependencies, the DB tests are
+skipped. The model is replaced by FakeOllama so no Ollama server is needed.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # must be set before db.py / routers read them at import time
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="jorge-uploads-"))
+    os.environ["UPLOAD_GC_INTERVAL_S"] = "0"
+    os.environ["SUMMARY_SWEEP_INTERVAL_S"] = "0"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+class FakeOllama:
+    """Enough of ollama.AsyncClient.chat for send_message and summaries."""
+
+    def __init__(self, reply: str = "## 📝 Summary\n\nFake answer."):
+        self.reply = reply
+        self.calls = 0
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        if not stream:
+            return SimpleNamespace(message=SimpleNamespace(content=self.reply))
+
+        async def gen():
+            for word in self.reply.split(" "):
+                yield SimpleNamespace(
+                    message=SimpleNamespace(content=word + " ", thinking=None),
+                    done=False,
+                    eval_count=None,
+                )
+            yield SimpleNamespace(
+                message=SimpleNamespace(content="", thinking=None),
+                done=True,
+                eval_count=len(self.reply.split(" ")),
+            )
+
+        return gen()
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    psycopg = pytest.importorskip("psycopg")
+    pytest.importorskip("fastapi")
+
+    # db/ is not a package (db.py shadows it), so load the runner by path
+    spec = importlib.util.spec_from_file_location(
+        "db_migrate", BACKEND_DIR / "db" / "migrate.py"
+    )
+    db_migrate = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(db_migrate)
+
+    try:
+        db_migrate.migrate(TEST_DATABASE_URL)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"test database unreachable: {e}")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    import llm
+
+    fake = FakeOllama()
+    monkeypatch.setattr(llm, "_ollama_client", fake)
+    return fake
+
+
+@pytest.fixture
+def client(database_url, fake_ollama):
+    from fastapi.testclient import TestClient
+
+    from api import create_app
+
+    with TestClient(create_app()) as c:
+        yield c
+
+
+@pytest.fixture
+def user_id(database_url):
+    import psycopg
+
+    with psycopg.connect(database_url) as conn:
+        row = conn.execute("INSERT INTO users DEFAULT VALUES RETURNING id").fetchone()
+        conn.commit()
+    yield str(row[0])
+    with psycopg.connect(database_url) as conn:
+        conn.execute("DELETE FROM users WHERE id = %s", (row[0],))
+        conn.commit()
@@ -0,0 +1,384 @@
+from pathlib import Path
+
+import pytest
+
+SAMPLE_PDF = next(
+    (Path(__file__).resolve().parent.parent / "loadtest" / "samples").glob("*.pdf")
+)
+
+
+def create_conversation(client, user_id: str) -> str:
+    resp = client.post("/conversations", json={"user_id": user_id})
+    assert resp.status_code == 200, resp.text
+    return resp.json()["conversation"]["id"]
+
+
+def test_send_message_stores_both_rows(client, user_id):
+    convo_id = create_conversation(client, user_id)
+
+    resp = client.post(
+        f"/conversations/{convo_id}/messages", json={"content": "What is a GIN index?"}
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["assistant_message"]["content"].startswith("## 📝 Summary")
+
+    messages = client.get(f"/conversations/{convo_id}/messages").json()["messages"]
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+
+
+def test_upload_and_delete_file(client, user_id):
+    convo_id = create_conversation(client, user_id)
+
+    with SAMPLE_PDF.open("rb") as f:
+        resp = client.post(
+            f"/conversations/{convo_id}/files",
+            files={"file": ("notes.pdf", f, "application/pdf")},
+        )
+    assert resp.status_code == 200, resp.text
+    file_id = resp.json()["file"]["id"]
+
+    files = client.get(f"/conversations/{convo_id}/files").json()["files"]
+    assert [f["id"] for f in files] == [file_id]
+
+    resp = client.delete(f"/conversations/{convo_id}/files/{file_id}")
+    assert resp.status_code == 200, resp.text
+    assert client.get(f"/conversations/{convo_id}/files").json()["files"] == []
+
+
+def test_events_socket_receives_message_appended(client, user_id):
+    convo_id = create_conversation(client, user_id)
+
+    with client.websocket_connect(f"/users/{user_id}/events") as ws:
+        resp = client.post(
+            f"/conversations/{convo_id}/messages", json={"content": "hello"}
+        )
+        assert resp.status_code == 200, resp.text
+        event = ws.receive_json()
+        while event["type"] != "message.appended":
+            event = ws.receive_json()
+
+    ids = [resp.json()["user_message"]["id"], resp.json()["assistant_message"]["id"]]
+    assert event["data"]["conversation_id"] == convo_id
+    assert event["data"]["message_ids"] == ids
+
+
+def test_export_import_round_trip_copies_files(client, user_id, database_url):
+    import psycopg
+
+    convo_id = create_conversation(client, user_id)
+    with SAMPLE_PDF.open("rb") as f:
+        client.post(
+            f"/conversations/{convo_id}/files",
+            files={"file": ("notes.pdf", f, "application/pdf")},
+        )
+
+    export = client.get(f"/users/{user_id}/export").content
+    # importing into the same database must not reuse the exported paths
+    for _ in range(2):
+        resp = client.post(f"/users/{user_id}/import", content=export)
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["imported"]["files"] == 1
+
+    with psycopg.connect(database_url) as conn:
+        rows = conn.execute(
+            """
+            SELECT f.storage_path, f.text_extracted_at
+            FROM conversation_files f
+            JOIN conversations c ON c.id = f.conversation_id
+            WHERE c.user_id = %s
+            """,
+            (user_id,),
+        ).fetchall()
+    assert len({path for path, _ in rows}) == 3
+    assert all(Path(path).is_file() for path, _ in rows)
+    assert all(extracted_at is not None for _, extracted_at in rows)
+
+
+def test_failed_extraction_is_left_for_backfill(client, user_id, database_url):
+    import psycopg
+
+    convo_id = create_conversation(client, user_id)
+    resp = client.post(
+        f"/conversations/{convo_id}/files",
+        files={"file": ("broken.pdf", b"not a pdf", "application/pdf")},
+    )
+    assert resp.status_code == 200, resp.text
+
+    with psycopg.connect(database_url) as conn:
+        row = conn.execute(
+            "SELECT text_extracted_at FROM conversation_files WHERE id = %s",
+            (resp.json()["file"]["id"],),
+        ).fetchone()
+    assert row[0] is None
+
+    # the backfill retries, fails again, and the send still goes through
+    resp = client.post(f"/conversations/{convo_id}/messages", json={"content": "hi"})
+    assert resp.status_code == 200, resp.text
+
+
+def test_sweep_summarizes_imported_files(client, user_id, database_url):
+    import asyncio
+
+    import psycopg
+
+    from file_context import summarize_pending
+
+    convo_id = create_conversation(client, user_id)
+    with SAMPLE_PDF.open("rb") as f:
+        client.post(
+            f"/conversations/{convo_id}/files",
+            files={"file": ("notes.pdf", f, "application/pdf")},
+        )
+    export = client.get(f"/users/{user_id}/export").content
+    assert client.post(f"/users/{user_id}/import", content=export).status_code == 200
+
+    assert asyncio.run(summarize_pending(batch_size=1000)) >= 1
+
+    with psycopg.connect(database_url) as conn:
+        rows = conn.execute(
+            """
+            SELECT f.summarized_at
+            FROM conversation_files f
+            JOIN conversations c ON c.id = f.conversation_id
+            WHERE c.user_id = %s
+            """,
+            (user_id,),
+        ).fetchall()
+    assert len(rows) == 2
+    assert all(summarized_at is not None for (summarized_at,) in rows)
+
+
+def test_crud_worker_upload_leaves_summary_to_sweep(
+    database_url, fake_ollama, user_id
+):
+    from fastapi.testclient import TestClient
+
+    from api import create_app
+
+    with TestClient(create_app(include_chat=False)) as crud:
+        convo_id = create_conversation(crud, user_id)
+        with SAMPLE_PDF.open("rb") as f:
+            resp = crud.post(
+                f"/conversations/{convo_id}/files",
+                files={"file": ("notes.pdf", f, "application/pdf")},
+            )
+    assert resp.status_code == 200, resp.text
+    assert fake_ollama.calls == 0
+
+
+def test_failed_keyed_send_does_not_duplicate_user_row(client, user_id, fake_ollama):
+    convo_id = create_conversation(client, user_id)
+    chat = fake_ollama.chat
+
+    async def failing_chat(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    fake_ollama.chat = failing_chat
+    headers = {"Idempotency-Key": "retry-me"}
+    with pytest.raises(RuntimeError):
+        client.post(
+            f"/conversations/{convo_id}/messages",
+            json={"content": "hello"},
+            headers=headers,
+        )
+
+    fake_ollama.chat = chat
+    resp = client.post(
+        f"/conversations/{convo_id}/messages",
+        json={"content": "hello"},
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    messages = client.get(f"/conversations/{convo_id}/messages").json()["messages"]
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+
+
+def test_search_pages_through_ranked_matches(client, user_id, monkeypatch):
+    from routers import conversations
+
+    monkeypatch.setattr(conversations, "SEARCH_MAX_CANDIDATES", 3)
+    convo_id = create_conversation(client, user_id)
+    for i in range(4):
+        client.post(
+            f"/conversations/{convo_id}/messages", json={"content": f"tsvector {i}"}
+        )
+
+    # ranks the 3 newest matches, 2 per page, then says older ones exist
+    windows, params = [], {"user_id": user_id, "q": "tsvector", "limit": 2}
+    seen: list[int] = []
+    while True:
+        page = client.get("/search", params=params).json()
+        seen += [hit["message_id"] for hit in page["results"]]
+        if page["next"] is not None:
+            params.update(page["next"])
+            continue
+        windows.append(page["truncated"])
+        if page["older"] is None:
+            break
+        params = {
+            "user_id": user_id,
+            "q": "tsvector",
+            "limit": 2,
+            **page["older"],
+        }
+    assert windows == [True, False]
+    assert len(seen) == len(set(seen)) == 4
+
+
+def test_import_ignores_paths_outside_upload_dir(client, user_id, database_url):
+    import orjson
+    import psycopg
+
+    from routers.files import UPLOAD_DIR
+
+    before = set(UPLOAD_DIR.iterdir())
+    lines = [
+        {"type": "conversation", "id": "c1", "created_at": "2026-01-01T00:00:00Z"},
+        {
+            "type": "file",
+            "conversation_id": "c1",
+            "filename": "passwd.pdf",
+            "mime_type": "application/pdf",
+            "storage_path": "/etc/passwd",
+            "created_at": "2026-01-01T00:00:00Z",
+        },
+    ]
+    resp = client.post(
+        f"/users/{user_id}/import",
+        content=b"\n".join(orjson.dumps(line) for line in lines),
+    )
+    assert resp.status_code == 200, resp.text
+    assert set(UPLOAD_DIR.iterdir()) == before
+
+    with psycopg.connect(database_url) as conn:
+        row = conn.execute(
+            """
+            SELECT f.storage_path, f.text_extracted_at
+            FROM conversation_files f
+            JOIN conversations c ON c.id = f.conversation_id
+            WHERE c.user_id = %s
+            """,
+            (user_id,),
+        ).fetchone()
+    # kept as a missing file: nothing on disk, never extracted
+    assert not Path(row[0]).exists()
+    assert row[1] is not None
+
+
+def test_import_ignores_other_users_uploads(client, user_id, database_url):
+    import psycopg
+
+    convo_id = create_conversation(client, user_id)
+    with SAMPLE_PDF.open("rb") as f:
+        client.post(
+            f"/conversations/{convo_id}/files",
+            files={"file": ("notes.pdf", f, "application/pdf")},
+        )
+    export = client.get(f"/users/{user_id}/export").content
+
+    with psycopg.connect(database_url) as conn:
+        other = conn.execute("INSERT INTO users DEFAULT VALUES RETURNING id").fetchone()
+        conn.commit()
+    try:
+        resp = client.post(f"/users/{other[0]}/import", content=export)
+        assert resp.status_code == 200, resp.text
+        with psycopg.connect(database_url) as conn:
+            (path,) = conn.execute(
+                """
+                SELECT f.storage_path
+                FROM conversation_files f
+                JOIN conversations c ON c.id = f.conversation_id
+                WHERE c.user_id = %s
+                """,
+                (other[0],),
+            ).fetchone()
+        assert not Path(path).exists()
+    finally:
+        with psycopg.connect(database_url) as conn:
+            conn.execute("DELETE FROM users WHERE id = %s", (other[0],))
+            conn.commit()
+
+
+def test_disconnect_cancels_before_first_chunk(client, user_id, fake_ollama):
+    import asyncio
+
+    from fastapi import HTTPException
+
+    from routers import chat
+
+    convo_id = create_conversation(client, user_id)
+    closed = []
+
+    async def queued_chat(*args, **kwargs):
+        async def gen():
+            try:
+                await asyncio.sleep(60)  # still waiting for the Ollama slot
+                yield None
+            finally:
+                closed.append(True)
+
+        return gen()
+
+    async def gone() -> bool:
+        return True
+
+    async def run():
+        body = chat.SendMessageBody(content="hello")
+        with pytest.raises(HTTPException) as exc:
+            await asyncio.wait_for(chat.generate_reply(convo_id, body, gone), 5)
+        assert exc.value.status_code == 499
+
+    fake_ollama.chat = queued_chat
+    asyncio.run(run())
+    assert closed == [True]
+
+
+def test_sweep_skips_files_that_fit_the_context(client, user_id, database_url):
+    import asyncio
+
+    import psycopg
+
+    from file_context import summarize_pending
+
+    convo_id = create_conversation(client, user_id)
+    with psycopg.connect(database_url) as conn:
+        (file_id,) = conn.execute(
+            """
+            INSERT INTO conversation_files (
+                conversation_id, filename, storage_path, extracted_text,
+                text_extracted_at
+            )
+            VALUES (%s, 'short.pdf', %s, 'PAGE 1:\nshort', now())
+            RETURNING id
+            """,
+            (convo_id, f"/nonexistent/{convo_id}.pdf"),
+        ).fetchone()
+        conn.commit()
+
+    asyncio.run(summarize_pending(batch_size=1000))
+
+    with psycopg.connect(database_url) as conn:
+        (summarized_at,) = conn.execute(
+            "SELECT summarized_at FROM conversation_files WHERE id = %s", (file_id,)
+        ).fetchone()
+    assert summarized_at is None
+
+
+def test_keyed_send_replays_and_drops_requests(client, user_id):
+    from routers import chat
+
+    convo_id = create_conversation(client, user_id)
+    headers = {"Idempotency-Key": "replay-me"}
+    first, second = (
+        client.post(
+            f"/conversations/{convo_id}/messages",
+            json={"content": "hello"},
+            headers=headers,
+        )
+        for _ in range(2)
+    )
+    assert first.json() == second.json()
+    messages = client.get(f"/conversations/{convo_id}/messages").json()["messages"]
+    assert len(messages) == 2
+    assert chat.IDEMPOTENCY_CACHE[(convo_id, "replay-me")].requests == []
@@ -0,0 +1,50 @@
+import zipfile
+
+from extraction import extract_text_from_pptx
+
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+
+def _slide(text: str) -> str:
+    return (
+        f'<p:sld xmlns:p="{P_NS}" xmlns:a="{A_NS}"><p:cSld><p:spTree><p:sp>'
+        f"<p:txBody><a:p><a:r><a:t>{text}</a:t></a:r></a:p></p:txBody>"
+        "</p:sp></p:spTree></p:cSld></p:sld>"
+    )
+
+
+def test_pptx_absolute_and_external_targets(tmp_path):
+    path = tmp_path / "deck.pptx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(
+            "ppt/presentation.xml",
+            f'<p:presentation xmlns:p="{P_NS}" xmlns:r="{DOC_REL}"><p:sldIdLst>'
+            '<p:sldId id="256" r:id="rId1"/><p:sldId id="257" r:id="rId2"/>'
+            "</p:sldIdLst></p:presentation>",
+        )
+        zf.writestr(
+            "ppt/_rels/presentation.xml.rels",
+            f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{DOC_REL}/slide" '
+            'Target="slides/slide1.xml"/>'
+            f'<Relationship Id="rId2" Type="{DOC_REL}/slide" '
+            'Target="/ppt/slides/slide2.xml"/>'
+            "</Relationships>",
+        )
+        zf.writestr("ppt/slides/slide1.xml", _slide("Relative target"))
+        zf.writestr("ppt/slides/slide2.xml", _slide("Absolute target"))
+        zf.writestr(
+            "ppt/slides/_rels/slide2.xml.rels",
+            f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId9" Type="{DOC_REL}/notesSlide" '
+            'Target="https://example.com/ppt/notesSlides/x.xml" '
+            'TargetMode="External"/>'
+            "</Relationships>",
+        )
+
+    text, slide_count = extract_text_from_pptx(str(path))
+    assert slide_count == 2
+    assert text == "SLIDE 1:\nRelative target\n\nSLIDE 2:\nAbsolute target"
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("psycopg")
+
+from file_context import split_into_sections  # noqa: E402
+
+
+def test_split_keeps_text_before_first_marker():
+    text = "Course intro\n\nSLIDE 1:\nfirst\n\nSLIDE 2:\nsecond"
+    assert split_into_sections(text) == [
+        ("INTRO", "Course intro"),
+        ("SLIDE 1-2", "SLIDE 1:\nfirst\n\nSLIDE 2:\nsecond"),
+    ]
+
+
+def test_split_groups_markers_up_to_max_chars():
+    text = "\n\n".join(f"PAGE {i}:\n{'x' * 30}" for i in range(1, 5))
+    labels = [label for label, _ in split_into_sections(text, max_chars=80)]
+    assert labels == ["PAGE 1-2", "PAGE 3-4"]
+
+
+def test_split_without_markers_uses_parts():
+    sections = split_into_sections("a\n\nb\n\nc", max_chars=1)
+    assert [label for label, _ in sections] == ["PART 1", "PART 2", "PART 3"]
@@ -0,0 +1,136 @@
+"""
+Background auto-titling of conversations.
+
+send_message enqueues the first exchange of a conversation; a single worker
+task titles it with a small model off the request path. When the queue backs
+up, several conversations are titled with one model call. The write is a
+compare-and-swap on the title we read, so a user rename always wins.
+"""
+
+import asyncio
+import logging
+import os
+import re
+
+from db import get_conn
+from events import notify_user
+from llm import get_ollama_client
+from prompts import strip_thinking
+
+logger = logging.getLogger(__name__)
+
+TITLE_MODEL = os.environ.get("TITLE_MODEL", "qwen3:0.6b")
+TITLE_BATCH_SIZE = 8
+TITLE_MAX_CHARS = 60
+TITLE_SNIPPET_CHARS = 400
+# titles the app sets on creation; these may be replaced automatically
+PLACEHOLDER_TITLES = {"", "New chat"}
+
+TITLE_PROMPT = (
+    "You name study chat conversations. Reply with a short title (max 6 words) "
+    "for each numbered conversation, one per line as '<number>. <title>'. "
+    "No quotes, no extra text."
+)
+
+title_queue: "asyncio.Queue[tuple[str, str, str]]" = asyncio.Queue(maxsize=1000)
+
+
+def enqueue_title(conversation_id: str, user_text: str, assistant_text: str) -> None:
+    try:
+        title_queue.put_nowait(
+            (
+                conversation_id,
+                user_text[:TITLE_SNIPPET_CHARS],
+                assistant_text[:TITLE_SNIPPET_CHARS],
+            )
+        )
+    except asyncio.QueueFull:
+        pass  # best effort: the conversation just keeps its placeholder title
+
+
+def clean_title(raw: str) -> str:
+    title = raw.strip().strip("\"'`*#").strip()
+    title = re.sub(r"\s+", " ", title).rstrip(".:;,")
+    return title[:TITLE_MAX_CHARS].strip()
+
+
+async def generate_titles(items: list[tuple[str, str, str]]) -> None:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, title FROM conversations WHERE id = ANY(%s)",
+            ([item[0] for item in items],),
+        )
+        current = {str(r[0]): r[1] for r in cur.fetchall()}
+
+    # skip deleted or already (re)named conversations
+    items = [
+        item
+        for item in items
+        if item[0] in current and (current[item[0]] or "") in PLACEHOLDER_TITLES
+    ]
+    if not items:
+        return
+
+    prompt = "\n\n".join(
+        f"{n}. Student: {user_text}\nAssistant: {assistant_text}"
+        for n, (_, user_text, assistant_text) in enumerate(items, start=1)
+    )
+    resp = await get_ollama_client().chat(
+        model=TITLE_MODEL,
+        messages=[
+            {"role": "system", "content": TITLE_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        think=False,
+        options={"num_predict": 16 * len(items), "temperature": 0.2},
+        stream=False,
+    )
+    text = strip_thinking(resp.message.content or "")
+
+    titles: dict[int, str] = {}
+    for line in text.splitlines():
+        m = re.match(r"^\s*(\d+)[.):-]\s*(.+)$", line)
+        if m:
+            titles[int(m.group(1))] = clean_title(m.group(2))
+    if len(items) == 1 and not titles and text.strip():
+        titles[1] = clean_title(text.splitlines()[0])
+
+    with get_conn() as conn, conn.cursor() as cur:
+        for n, (conversation_id, _, _) in enumerate(items, start=1):
+            title = titles.get(n)
+            if not title:
+                continue
+            # compare-and-swap: only replace the exact title we read above
+            cur.execute(
+                """
+                UPDATE conversations
+                SET title = %s
+                WHERE id = %s AND title IS NOT DISTINCT FROM %s
+                RETURNING user_id, updated_at
+                """,
+                (title, conversation_id, current[conversation_id]),
+            )
+            row = cur.fetchone()
+            if row is not None:
+                notify_user(
+                    cur,
+                    row[0],
+                    "conversation.renamed",
+                    {
+                        "id": conversation_id,
+                        "title": title,
+                        "updated_at": row[1].isoformat(),
+                    },
+                )
+        conn.commit()
+
+
+async def title_worker() -> None:
+    while True:
+        batch = [await title_queue.get()]
+        while len(batch) < TITLE_BATCH_SIZE and not title_queue.empty():
+            batch.append(title_queue.get_nowait())
+        try:
+            await generate_titles(batch)
+        except Exception:
+            logger.exception("auto-titling %d conversation(s) failed", len(batch))
@@ -1,7 +1,8 @@
-import React, { createContext, useCallback, useContext, useMemo, useState } from 'react';
+import React, { createContext, useCallback, useContext, useEffect, useMemo, useRef, useState } from 'react';
 import * as DocumentPicker from 'expo-document-picker'
 
 type Conversation = { id: string; title: string | null; updated_at: string };
+type ServerEvent = { type: string; data: any };
 type Message = { id?: number; role: 'user' | 'assistant' | 'system' | 'error'; content: string; created_at?: string };
 type MessageIntent = 'summary' | 'study_plan' | 'practice_questions' | 'custom';
 type OutputMode = 'quick' | 'full' | 'study_ready';
@@ -44,6 +45,8 @@ const DatabaseContext = createContext<DatabaseContextType | null>(null);
 
 const API_BASE = process.env.EXPO_PUBLIC_API_BASE!;
 const USER_ID = process.env.EXPO_PUBLIC_USER_ID!;
+// waits before re-sending a message after a network error (same Idempotency-Key)
+const SEND_RETRY_DELAYS_MS = [1000, 3000, 8000];
 
 async function mustJson(res: Response) {
     if (!res.ok) {
@@ -60,6 +63,37 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState<string | null>(null);
     const [conversationFiles, setConversationFiles] = useState<ConversationFile[]>([]);
+    // messages already loaded per conversation, so reopening only fetches the delta
+    const messageCache = useRef<Record<string, Message[]>>({});
+    // conversations with a send in flight: the HTTP reply owns their new rows
+    const pendingSends = useRef<Set<string>>(new Set());
+
+    const loadMessages = useCallback(async (conversationId: string): Promise<Message[]> => {
+        const cached = messageCache.current[conversationId];
+        const lastId = cached?.length ? cached[cached.length - 1].id : undefined;
+
+        if (cached === undefined || lastId === undefined) {
+            const res = await fetch(`${API_BASE}/conversations/${conversationId}/messages?limit=50`);
+            const data = await mustJson(res);
+            messageCache.current[conversationId] = data.messages ?? [];
+            return messageCache.current[conversationId];
+        }
+
+        let merged = cached;
+        let afterId = lastId;
+        while (true) {
+            const res = await fetch(`${API_BASE}/conversations/${conversationId}/messages?limit=50&after_id=${afterId}`);
+            const data = await mustJson(res);
+            const fresh: Message[] = data.messages ?? [];
+            if (fresh.length > 0) {
+                merged = [...merged, ...fresh];
+                afterId = fresh[fresh.length - 1].id!;
+            }
+            if (!data.has_more) break;
+        }
+        messageCache.current[conversationId] = merged;
+        return merged;
+    }, []);
 
     const activeConversationTitle =
         conversations.find(c => c.id === activeConversationId)?.title ?? 'New chat';
@@ -159,15 +193,13 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
         setActiveConversationId(conversationId);
         setLoading(true); setError(null);
         try {
-            const res = await fetch(`${API_BASE}/conversations/${conversationId}/messages?limit=50`);
-            const data = await res.json();
-            setMessages(data.messages ?? []);
+            setMessages(await loadMessages(conversationId));
         } catch (e: any) {
             setError(e?.message ?? 'Failed to load messages');
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [loadMessages]);
 
     const refreshConversationFiles = useCallback(async (conversationId: string) => {
         setError(null);
@@ -185,9 +217,7 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
             const id = conversations[0].id;
             setActiveConversationId(id);
             // also load its messages
-            const res = await fetch(`${API_BASE}/conversations/${id}/messages?limit=50`);
-            const data = await res.json();
-            setMessages(data.messages ?? []);
+            setMessages(await loadMessages(id));
             return id;
         }
 
@@ -204,7 +234,7 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
         setActiveConversationId(convo.id);
         setMessages([]);
         return convo.id;
-    }, [activeConversationId, conversations, API_BASE]);
+    }, [activeConversationId, conversations, loadMessages, API_BASE]);
 
     const uploadConversationFiles = useCallback(async (conversationId: string) => {
         setError(null);
@@ -264,17 +294,36 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
         ]);
 
         setError(null);
+        pendingSends.current.add(convoId);
+        const idempotencyKey = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
+        const post = () => fetch(`${API_BASE}/conversations/${convoId}/messages`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                // same key on every retry: the server joins the generation
+                // still running for it, or replays its stored result
+                'Idempotency-Key': idempotencyKey,
+            },
+            body: JSON.stringify({
+                content: trimmed,
+                intent: opts?.intent ?? 'custom',
+                output_mode: opts?.output_mode ?? 'full',
+            }),
+        });
 
         try {
-            const res = await fetch(`${API_BASE}/conversations/${convoId}/messages`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    content: trimmed,
-                    intent: opts?.intent ?? 'custom',
-                    output_mode: opts?.output_mode ?? 'full',
-                }),
-            });
+            let res: Response;
+            for (let attempt = 0; ; attempt++) {
+                try {
+                    res = await post();
+                    break;
+                } catch (e) {
+                    // fetch only rejects on network errors; HTTP errors are not retried
+                    if (attempt >= SEND_RETRY_DELAYS_MS.length) throw e;
+                    await new Promise(resolve => setTimeout(resolve, SEND_RETRY_DELAYS_MS[attempt]));
+                }
+            }
 
             if (!res.ok) {
                 const t = await res.text();
@@ -283,14 +332,18 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
 
             const data = await res.json();
 
-            // replace last placeholder bubble with assistant content
-            setMessages(prev => {
-                const next = [...prev];
-                next[next.length - 1] = data.assistant_message; // server returns full object
-                return next;
-            });
+            const sent: Message[] = [data.user_message, data.assistant_message];
+            const sentIds = new Set(sent.map(m => m.id));
 
-            // refresh conversations list order (updated_at changed)
+            // swap the two optimistic bubbles for the stored rows (server returns
+            // full objects); drop any copy of them that arrived some other way
+            setMessages(prev => [...prev.slice(0, -2).filter(m => !sentIds.has(m.id)), ...sent]);
+            const cached = messageCache.current[convoId];
+            if (cached) {
+                messageCache.current[convoId] = [...cached.filter(m => !sentIds.has(m.id)), ...sent];
+            }
+
+            // cheap fallback for list order/title in case a socket event was missed
             refreshConversations();
         } catch (e: any) {
             setMessages(prev => {
@@ -299,9 +352,95 @@ export function DatabaseProvider({ children }: { children: React.ReactNode }) {
                 return next;
             });
             setError(e?.message ?? 'Send failed');
+        } finally {
+            pendingSends.current.delete(convoId);
         }
     }, [API_BASE, ensureActiveConversation, refreshConversations]);
 
+    // Live updates pushed by the server (replaces refetching after actions).
+    const activeIdRef = useRef(activeConversationId);
+    activeIdRef.current = activeConversationId;
+
+    const handleServerEvent = useCallback(async (event: ServerEvent) => {
+        const d = event.data ?? {};
+        switch (event.type) {
+            case 'conversation.created':
+                setConversations(prev => prev.some(c => c.id === d.id) ? prev : [d, ...prev]);
+                break;
+            case 'conversation.renamed':
+                setConversations(prev => prev.map(c => (c.id === d.id ? { ...c, title: d.title } : c)));
+                break;
+            case 'conversation.deleted':
+                setConversations(prev => prev.filter(c => c.id !== d.id));
+                delete messageCache.current[d.id];
+                break;
+            case 'message.appended': {
+                setConversations(prev => {
+                    const convo = prev.find(c => c.id === d.conversation_id);
+                    if (!convo) return prev;
+                    return [{ ...convo, updated_at: d.updated_at }, ...prev.filter(c => c.id !== d.conversation_id)];
+                });
+                if (d.conversation_id !== activeIdRef.current) break;
+                // our own send: sendMessage places these rows when the reply lands
+                if (pendingSends.current.has(d.conversation_id)) break;
+                // skip our own send: its rows are already in the cache
+                const cached = messageCache.current[d.conversation_id] ?? [];
+                const known = new Set(cached.map(m => m.id));
+                if ((d.message_ids ?? []).every((id: number) => known.has(id))) break;
+                setMessages(await loadMessages(d.conversation_id));
+                break;
+            }
+            case 'file.ingested':
+            case 'file.deleted':
+                if (d.conversation_id === activeIdRef.current) {
+                    await refreshConversationFiles(d.conversation_id);
+                }
+                break;
+            case 'resync':
+                messageCache.current = {};
+                await refreshConversations();
+                break;
+        }
+    }, [loadMessages, refreshConversationFiles, refreshConversations]);
+
+    const handleServerEventRef = useRef(handleServerEvent);
+    handleServerEventRef.current = handleServerEvent;
+
+    useEffect(() => {
+        let ws: WebSocket | null = null;
+        let retry: ReturnType<typeof setTimeout> | null = null;
+        let closed = false;
+        let delay = 1000;
+
+        const connect = () => {
+            ws = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/users/${encodeURIComponent(USER_ID)}/events`);
+            ws.onopen = () => { delay = 1000; };
+            ws.onmessage = e => {
+                try {
+                    handleServerEventRef.current(JSON.parse(e.data));
+                } catch {
+                    // ignore malformed events
+                }
+            };
+            ws.onclose = () => {
+                if (closed) return;
+                // events may have been missed while disconnected
+                retry = setTimeout(() => {
+                    handleServerEventRef.current({ type: 'resync', data: {} });
+                    connect();
+                }, delay);
+                delay = Math.min(delay * 2, 30000);
+            };
+        };
+        connect();
+
+        return () => {
+            closed = true;
+            if (retry) clearTimeout(retry);
+            ws?.close();
+        };
+    }, []);
+
     const value = useMemo(() => ({
         conversations,
         activeConversationTitle,